@@ -0,0 +1,160 @@
+"""Синхронные представления под WSGI против асинхронных под ASGI.
+
+Каждый режим запускается в отдельном процессе со своей базой в файле:
+    wsgi       — notes.views, пул потоков с django.test.Client;
+    asgi       — notes.async_views, один цикл событий с AsyncClient;
+    asgi_sync  — notes.views под ASGI: цена синхронных представлений.
+Запросы — вперемешку список и страницы заметок, кэш страниц отключён,
+чтобы нагрузка доходила до базы.
+
+    python -m benchmarks.asgi_wsgi --concurrency 1 10 100 200 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .utils import report
+
+# Режим: (асинхронные представления, драйвер).
+MODES = {
+    'wsgi': ('0', 'threads'),
+    'asgi': ('1', 'asyncio'),
+    'asgi_sync': ('0', 'asyncio'),
+}
+
+
+def summarize(mode, concurrency, timings, elapsed):
+    timings.sort()
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'requests': len(timings),
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(timings[len(timings) // 2], 3),
+        'p99_ms': round(timings[int(len(timings) * 0.99) - 1], 3),
+    }
+
+
+def run_threads(client, urls, concurrency):
+    from django.db import connection
+
+    def call(url):
+        started = time.perf_counter()
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        return (time.perf_counter() - started) * 1000
+
+    def close_connection():
+        connection.close()
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        timings = list(pool.map(call, urls))
+        # Каждый поток открыл своё соединение с базой.
+        list(pool.map(lambda _: close_connection(), range(concurrency)))
+    return timings
+
+
+async def run_asyncio(client, urls, concurrency):
+    queue = iter(urls)
+    timings = []
+
+    async def worker():
+        for url in queue:
+            started = time.perf_counter()
+            response = await client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings
+
+
+def run_worker(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import AsyncClient, Client
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    from .utils import create_user, seed_notes
+
+    override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }}).enable()
+    call_command('migrate', verbosity=0)
+    user = create_user('bench')
+    seed_notes(user, args.notes)
+    connection.close()
+
+    rng = random.Random(0)
+    list_url = reverse('notes:list')
+    driver = MODES[args.mode][1]
+    client = Client() if driver == 'threads' else AsyncClient()
+    client.force_login(user)
+    results = []
+    prefix = f'u{user.pk}-'
+    for concurrency in args.concurrency:
+        urls = [
+            list_url if rng.random() < 0.5 else reverse(
+                'notes:detail', args=(f'{prefix}{rng.randrange(args.notes)}',)
+            )
+            for _ in range(args.requests)
+        ]
+        started = time.perf_counter()
+        if driver == 'threads':
+            timings = run_threads(client, urls, concurrency)
+        else:
+            timings = asyncio.run(run_asyncio(client, urls, concurrency))
+        elapsed = time.perf_counter() - started
+        results.append(summarize(args.mode, concurrency, timings, elapsed))
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 10, 100, 200])
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Запросов на каждый уровень параллельности.')
+    parser.add_argument('--notes', type=int, default=1000)
+    parser.add_argument('--modes', nargs='+', choices=MODES,
+                        default=list(MODES))
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        run_worker(args)
+        return
+
+    results = []
+    for mode in args.modes:
+        async_views, _ = MODES[mode]
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                YANOTE_ASYNC_VIEWS=async_views,
+                YANOTE_DB_PATH=str(Path(directory) / 'bench.sqlite3'),
+            )
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.asgi_wsgi',
+                 *sys.argv[1:], '--mode', mode],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results.extend(json.loads(output.splitlines()[-1]))
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
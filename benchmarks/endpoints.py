@@ -0,0 +1,225 @@
+"""Бенчмарк HTTP-страниц YaNote со сравнением с сохранённой базой.
+
+Заполняет тестовую базу пользователями и заметками, затем прогоняет
+через тестовый клиент Django страницы списка, заметки, создания,
+редактирования, удаления и входа. Для каждой страницы считает
+пропускную способность, перцентили задержки и число SQL-запросов.
+
+Результат сравнивается с benchmarks/baselines/endpoints.json: регрессией
+считается рост запросов на ответ или ухудшение p95 и пропускной
+способности больше чем на --tolerance. При регрессии код выхода 1.
+
+    python -m benchmarks.endpoints --users 10 --notes 1000 --requests 200
+    python -m benchmarks.endpoints --save-baseline
+
+Пароли хешируются MD5: бенчмарк измеряет приложение, а не PBKDF2.
+Кэш страниц отключён, чтобы каждый запрос доходил до базы.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from .utils import create_user, report, seed_notes, setup_django
+
+BASELINE = Path(__file__).parent / 'baselines' / 'endpoints.json'
+PASSWORD = 'bench-password'
+
+
+def summarize(name, timings, queries, elapsed):
+    timings = sorted(timings)
+    return {
+        'endpoint': name,
+        'requests': len(timings),
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(timings[len(timings) // 2], 3),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+        'p99_ms': round(timings[int(len(timings) * 0.99) - 1], 3),
+        'queries_per_request': round(statistics.fmean(queries), 2),
+        'max_queries': max(queries),
+    }
+
+
+def run(name, calls):
+    """Выполняет запросы calls, возвращает сводку по странице."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings, queries = [], []
+    started = time.perf_counter()
+    for call in calls:
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            response = call()
+            timings.append((time.perf_counter() - request_started) * 1000)
+        assert response.status_code < 400, (name, response.status_code)
+        queries.append(len(captured))
+    return summarize(name, timings, queries, time.perf_counter() - started)
+
+
+def compare(results, baseline, tolerance):
+    """Список регрессий относительно базы."""
+    baseline = {item['endpoint']: item for item in baseline}
+    regressions = []
+    for result in results:
+        base = baseline.get(result['endpoint'])
+        if base is None:
+            continue
+        checks = (
+            ('queries_per_request',
+             result['queries_per_request'] > base['queries_per_request']),
+            ('p95_ms', result['p95_ms'] > base['p95_ms'] * (1 + tolerance)),
+            ('requests_per_second',
+             result['requests_per_second']
+             < base['requests_per_second'] * (1 - tolerance)),
+        )
+        for metric, failed in checks:
+            if failed:
+                regressions.append({
+                    'endpoint': result['endpoint'],
+                    'metric': metric,
+                    'baseline': base[metric],
+                    'current': result[metric],
+                })
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--notes', type=int, default=1000,
+                        help='Заметок у каждого пользователя.')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Запросов к каждой странице.')
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Допустимое ухудшение времени, доля.')
+    return parser.parse_args()
+
+
+def make_endpoints(args):
+    """Заполняет базу и возвращает запросы к страницам по именам."""
+    from django.test import Client
+    from django.urls import reverse
+
+    rng = random.Random(0)
+    users = []
+    for number in range(args.users):
+        user = create_user(f'bench-{number}')
+        user.set_password(PASSWORD)
+        user.save(update_fields=('password',))
+        seed_notes(user, args.notes, text_size=500)
+        client = Client()
+        client.force_login(user)
+        users.append((user, client))
+
+    def pick():
+        user, client = rng.choice(users)
+        return user, client, f'u{user.pk}-{rng.randrange(args.notes)}'
+
+    def get_list():
+        _, client, _ = pick()
+        return client.get(reverse('notes:list'))
+
+    def get_detail():
+        _, client, slug = pick()
+        return client.get(reverse('notes:detail', args=(slug,)))
+
+    def post_add():
+        _, client, _ = pick()
+        return client.post(reverse('notes:add'), {
+            'title': 'Новая заметка', 'text': 'Текст новой заметки',
+        })
+
+    def post_edit():
+        _, client, slug = pick()
+        return client.post(reverse('notes:edit', args=(slug,)), {
+            'title': 'Изменённая заметка', 'text': 'Новый текст',
+            'slug': slug,
+        })
+
+    # Удаляем каждую заметку один раз: по порядку у каждого пользователя.
+    to_delete = iter([
+        (client, f'u{user.pk}-{number}')
+        for number in range(args.notes)
+        for user, client in users
+    ])
+
+    def post_delete():
+        client, slug = next(to_delete)
+        return client.post(reverse('notes:delete', args=(slug,)))
+
+    def post_login():
+        user, _, _ = pick()
+        return Client().post(reverse('users:login'), {
+            'username': user.username, 'password': PASSWORD,
+        })
+
+    # Удаление идёт последним, и на него хватит заметок вместе с прогревом.
+    return {
+        'list': get_list,
+        'detail': get_detail,
+        'add': post_add,
+        'edit': post_edit,
+        'login': post_login,
+        'delete': post_delete,
+    }
+
+
+def save_baseline(path, params, results):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(
+        {'params': params, 'results': results},
+        ensure_ascii=False, indent=2,
+    ) + '\n')
+    report({'results': results, 'baseline_saved': str(path)})
+
+
+def check_baseline(path, params, results, tolerance):
+    """Печатает результаты и регрессии; True, если регрессий нет."""
+    output = {'params': params, 'results': results}
+    baseline = json.loads(path.read_text()) if path.exists() else None
+    if baseline is None or baseline['params'] != params:
+        # Числа при другом объёме данных сравнивать бессмысленно.
+        output['baseline'] = 'не найдена или снята с другими параметрами'
+        report(output)
+        return True
+    output['regressions'] = compare(results, baseline['results'], tolerance)
+    report(output)
+    return not output['regressions']
+
+
+def main():
+    args = parse_args()
+    setup_django()
+    from django.test.utils import override_settings
+
+    override_settings(
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }},
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    ).enable()
+
+    endpoints = make_endpoints(args)
+    count = min(args.requests, args.users * args.notes - 1)
+    results = []
+    for name, call in endpoints.items():
+        call()  # Прогрев: шаблоны, подготовленные запросы.
+        results.append(run(name, [call] * count))
+
+    params = {
+        'users': args.users, 'notes': args.notes, 'requests': args.requests,
+    }
+    if args.save_baseline:
+        save_baseline(args.baseline, params, results)
+    elif not check_baseline(args.baseline, params, results, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
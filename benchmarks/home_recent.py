@@ -0,0 +1,82 @@
+"""Последние заметки на домашней странице: сортировка против индекса и кэша.
+
+У одного пользователя --notes заметок. Сравниваются:
+
+- sort_without_index — индекс note_author_recent_idx удалён, и запрос
+  сортирует все заметки автора по updated;
+- recent_index — тот же запрос по индексу, кэш страниц сброшен;
+- cached_page — страница из кэша.
+
+Для каждого случая — время ответа Home, число SQL-запросов и план.
+
+    python -m benchmarks.home_recent --notes 100000
+"""
+import argparse
+
+from .utils import create_user, measure, report, seed_notes, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100_000,
+                        help='Количество заметок у пользователя.')
+    parser.add_argument('--text-size', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+
+    from notes import caching
+    from notes.models import Note
+    from notes.views import Home, recent_notes
+
+    user = create_user('bench')
+    seed_notes(user, args.notes, text_size=args.text_size)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    index = next(
+        index for index in Note._meta.indexes
+        if index.name == 'note_author_recent_idx'
+    )
+    view = Home.as_view()
+    factory = RequestFactory()
+    queryset = recent_notes(Note.objects.filter(author=user))
+
+    def run(cold):
+        if cold:
+            caching.bump_version(user.pk)
+        request = factory.get('/')
+        request.user = user
+        response = view(request)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def case(name, cold):
+        with CaptureQueriesContext(connection) as queries:
+            run(cold)
+        stats = measure(lambda: run(cold), args.repeat)
+        stats.update(
+            case=name,
+            queries=len(queries),
+            plan=queryset.explain() if queries else None,
+        )
+        return stats
+
+    results = []
+    with connection.schema_editor() as editor:
+        editor.remove_index(Note, index)
+    results.append(case('sort_without_index', cold=True))
+    with connection.schema_editor() as editor:
+        editor.add_index(Note, index)
+    results.append(case('recent_index', cold=True))
+    run(cold=False)
+    results.append(case('cached_page', cold=False))
+    report({'notes': args.notes, 'results': results})
+
+
+if __name__ == '__main__':
+    main()
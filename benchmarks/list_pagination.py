@@ -0,0 +1,75 @@
+"""Сравнение списка заметок целиком и постраничного вывода по курсору.
+
+Запуск:
+
+    python -m benchmarks.list_pagination --notes 10000 100000
+"""
+import argparse
+
+from .utils import create_user, measure, report, seed_notes, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--notes', type=int, nargs='+', default=[10_000, 100_000],
+        help='Количество заметок у одного пользователя.'
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+    from django.views import generic
+
+    from notes.models import Note
+    from notes.pagination import NEXT, encode_cursor
+    from notes.views import NoteBase, NotesList
+
+    class FullNotesList(NoteBase, generic.ListView):
+        """Список в прежнем виде: все заметки и все колонки."""
+        template_name = 'notes/list.html'
+
+    factory = RequestFactory()
+
+    def run(view, user, query=None):
+        request = factory.get('/notes/', query or {})
+        request.user = user
+        response = view(request)
+        response.render()
+        return response
+
+    results = []
+    for count in args.notes:
+        user = create_user(f'bench-{count}')
+        seed_notes(user, count)
+        last_pk = (
+            Note.objects.filter(author=user).order_by('-pk')
+            .values_list('pk', flat=True)[NotesList.paginate_by]
+        )
+        cases = {
+            'full_list': (FullNotesList.as_view(), None),
+            'keyset_first_page': (NotesList.as_view(), None),
+            'keyset_last_page': (
+                NotesList.as_view(),
+                {'cursor': encode_cursor(NEXT, last_pk)},
+            ),
+        }
+        for name, (view, query) in cases.items():
+            with CaptureQueriesContext(connection) as queries:
+                response = run(view, user, query)
+            stats = measure(lambda: run(view, user, query), args.repeat)
+            stats.update(
+                case=name,
+                notes=count,
+                queries=len(queries),
+                response_bytes=len(response.content),
+            )
+            results.append(stats)
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Текст в строке заметки против текста в отдельной таблице notes_notebody.
+
+Заполняет базу в файле заметками с большими текстами (сжатие выключено,
+чтобы строки были честно большими) и копирует их в таблицу прежнего
+вида inline_note, где текст лежит между заголовком и адресом, с теми же
+индексами. На обеих раскладках выполняются одни и те же запросы:
+
+- list — страница списка автора;
+- lookup — поиск заметки по адресу, как у ETag подробной страницы;
+- detail — заметка с текстом;
+- updated_scan — перебор всех заметок по времени изменения, без индекса.
+
+Для каждого запроса — план, время на прогретом соединении и число
+страниц, которые SQLite прочитал из файла на новом соединении (по rchar
+из /proc/self/io, поэтому только на Linux; иначе null).
+
+    python -m benchmarks.note_body --notes 20000 --text-size 8000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from .utils import measure, report
+
+INLINE_TABLE = (
+    'CREATE TABLE inline_note ('
+    'id integer NOT NULL PRIMARY KEY, title varchar(100) NOT NULL, '
+    'text text NOT NULL, slug varchar(100) NOT NULL, '
+    'author_id integer NOT NULL, created datetime NOT NULL, '
+    'updated datetime NOT NULL, deleted datetime NULL)',
+    'INSERT INTO inline_note '
+    'SELECT n.id, n.title, b.text, n.slug, n.author_id, n.created, '
+    'n.updated, n.deleted '
+    'FROM notes_note n JOIN notes_notebody b ON b.note_id = n.id',
+    'CREATE UNIQUE INDEX inline_note_author_slug ON inline_note '
+    '(author_id, slug) WHERE deleted IS NULL',
+    'CREATE INDEX inline_note_list ON inline_note '
+    '(author_id, id, title, slug) WHERE deleted IS NULL',
+    'CREATE INDEX inline_note_author ON inline_note (author_id)',
+    'ANALYZE',
+)
+
+QUERIES = {
+    'inline': {
+        'list': 'SELECT id, title, slug FROM inline_note '
+                'WHERE author_id = :author AND deleted IS NULL '
+                'ORDER BY id LIMIT :limit',
+        'lookup': 'SELECT id, updated FROM inline_note '
+                  'WHERE author_id = :author AND slug = :slug '
+                  'AND deleted IS NULL',
+        'detail': 'SELECT id, title, text, slug, updated FROM inline_note '
+                  'WHERE author_id = :author AND slug = :slug '
+                  'AND deleted IS NULL',
+        'updated_scan': 'SELECT count(*) FROM inline_note '
+                        'WHERE updated > :since AND deleted IS NULL',
+    },
+    'body_table': {
+        'list': 'SELECT id, title, slug FROM notes_note '
+                'WHERE author_id = :author AND deleted IS NULL '
+                'ORDER BY id LIMIT :limit',
+        'lookup': 'SELECT id, updated FROM notes_note '
+                  'WHERE author_id = :author AND slug = :slug '
+                  'AND deleted IS NULL',
+        'detail': 'SELECT n.id, n.title, b.text, b.text_zlib, n.slug, '
+                  'n.updated FROM notes_note n '
+                  'LEFT JOIN notes_notebody b ON b.note_id = n.id '
+                  'WHERE n.author_id = :author AND n.slug = :slug '
+                  'AND n.deleted IS NULL',
+        'updated_scan': 'SELECT count(*) FROM notes_note '
+                        'WHERE updated > :since AND deleted IS NULL',
+    },
+}
+TABLES = {
+    'inline': ('inline_note',),
+    'body_table': ('notes_note', 'notes_notebody'),
+}
+
+
+def read_chars():
+    try:
+        with open('/proc/self/io') as io:
+            for line in io:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def connect(path):
+    connection = sqlite3.connect(path)
+    # Чтение через mmap не видно в rchar.
+    connection.execute('PRAGMA mmap_size = 0')
+    # Схема читается при первом запросе, её страницы не считаем.
+    connection.execute('SELECT count(*) FROM sqlite_master').fetchall()
+    return connection
+
+
+def pages_read(path, sql, params, page_size):
+    """Страницы, прочитанные запросом из файла на холодном соединении."""
+    connection = connect(path)
+    before = read_chars()
+    connection.execute(sql, params).fetchall()
+    after = read_chars()
+    connection.close()
+    if before is None:
+        return None
+    return round((after - before) / page_size)
+
+
+def table_pages(connection, tables):
+    """Страницы таблиц и их индексов или None без модуля dbstat."""
+    try:
+        return connection.execute(
+            'SELECT count(*) FROM dbstat WHERE name IN ({}) OR name IN '
+            '(SELECT name FROM sqlite_master WHERE tbl_name IN ({}))'.format(
+                ', '.join('?' * len(tables)), ', '.join('?' * len(tables))
+            ),
+            tables * 2,
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--notes', type=int, default=20_000,
+                        help='Заметок всего, поровну между пользователями.')
+    parser.add_argument('--text-size', type=int, default=8000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    path = str(Path(directory.name) / 'bench.sqlite3')
+    os.environ['YANOTE_DB_PATH'] = path
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection as django_connection
+    from django.test.utils import override_settings
+
+    from .utils import create_user, seed_notes
+
+    override_settings(NOTES_TEXT_COMPRESS_OVER=None).enable()
+    call_command('migrate', verbosity=0)
+    per_user = args.notes // args.users
+    authors = []
+    for number in range(args.users):
+        user = create_user(f'bench-{number}')
+        seed_notes(user, per_user, text_size=args.text_size)
+        authors.append(user.pk)
+    with django_connection.cursor() as cursor:
+        for sql in INLINE_TABLE:
+            cursor.execute(sql)
+        cursor.execute('SELECT max(updated) FROM notes_note')
+        since = cursor.fetchone()[0]
+    django_connection.close()
+
+    rng = random.Random(0)
+
+    def params():
+        author = rng.choice(authors)
+        return {
+            'author': author,
+            'slug': f'u{author}-{rng.randrange(per_user)}',
+            'limit': settings.NOTES_PER_PAGE + 1,
+            'since': since,
+        }
+
+    results = []
+    warm = connect(path)
+    page_size = warm.execute('PRAGMA page_size').fetchone()[0]
+    for layout, queries in QUERIES.items():
+        for name, sql in queries.items():
+            stats = measure(
+                lambda: warm.execute(sql, params()).fetchall(), args.repeat
+            )
+            plan = warm.execute(f'EXPLAIN QUERY PLAN {sql}', params())
+            stats.update(
+                layout=layout,
+                query=name,
+                plan='; '.join(row[-1] for row in plan),
+                pages_read=pages_read(path, sql, params(), page_size),
+            )
+            results.append(stats)
+    report({
+        'notes': per_user * args.users,
+        'text_size': args.text_size,
+        'page_size': page_size,
+        'table_pages': {
+            layout: table_pages(warm, tables)
+            for layout, tables in TABLES.items()
+        },
+        'results': results,
+    })
+    warm.close()
+    directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
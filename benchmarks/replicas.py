@@ -0,0 +1,194 @@
+"""Пропускная способность чтения заметок в зависимости от числа реплик.
+
+Для 0, 1, ..., --replicas реплик запускается отдельный процесс с
+основной базой в файле и репликами — её копиями (notes_sync_replicas,
+см. notes.routers). Процессы-читатели открывают список и заметки своих
+пользователей, процессы-писатели одновременно создают заметки других
+пользователей, так что читатели не привязываются к основной базе. Кэш
+общий для процессов (в файлах), как требуют реплики.
+Процессы, а не потоки: иначе всё упирается в GIL, а не в базу. Кэш
+страниц отключён, чтобы чтение доходило до базы. Реплики копируются один
+раз перед замером.
+
+Для каждого числа реплик — чтения и записи в секунду, p95 времени
+чтения и ошибки «database is locked».
+
+    python -m benchmarks.replicas --replicas 3 --readers 8 --writers 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from .utils import report
+
+
+def read(results, client, prefix, seed, args, stop):
+    """Читает список и заметки до stop, результат кладёт в results."""
+    from django.db import OperationalError
+    from django.urls import reverse
+
+    rng = random.Random(seed)
+    local = Counter()
+    timings = []
+    list_url = reverse('notes:list')
+    while time.monotonic() < stop:
+        if rng.random() < 0.5:
+            url = list_url
+        else:
+            slug = f'{prefix}{rng.randrange(args.notes)}'
+            url = reverse('notes:detail', args=(slug,))
+        started = time.perf_counter()
+        try:
+            response = client.get(url)
+        except OperationalError as error:
+            local['locked' if 'locked' in str(error) else 'db_errors'] += 1
+            continue
+        timings.append((time.perf_counter() - started) * 1000)
+        local['read'] += 1
+        if response.status_code >= 400:
+            local['http_errors'] += 1
+    results.put((local, timings))
+
+
+def write(results, client, stop):
+    """Создаёт заметки до stop, результат кладёт в results."""
+    from django.db import OperationalError
+    from django.urls import reverse
+
+    local = Counter()
+    add_url = reverse('notes:add')
+    while time.monotonic() < stop:
+        try:
+            response = client.post(add_url, {
+                'title': 'Заметка под нагрузкой', 'text': 'Текст',
+            })
+        except OperationalError as error:
+            local['locked' if 'locked' in str(error) else 'db_errors'] += 1
+            continue
+        local['write'] += 1
+        if response.status_code >= 400:
+            local['http_errors'] += 1
+    results.put((local, []))
+
+
+def run_worker(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from .utils import create_user, seed_notes
+
+    override_settings(NOTES_PAGE_CACHE_TIMEOUT=0).enable()
+    call_command('migrate', verbosity=0)
+
+    def login(name, notes):
+        user = create_user(name)
+        seed_notes(user, notes)
+        client = Client()
+        client.force_login(user)
+        return client, f'u{user.pk}-'
+
+    readers = [login(f'reader-{n}', args.notes) for n in range(args.readers)]
+    writers = [login(f'writer-{n}', 0) for n in range(args.writers)]
+    if settings.NOTES_DB_REPLICAS:
+        call_command('notes_sync_replicas', stdout=open(os.devnull, 'w'))
+    connections.close_all()
+
+    stop = time.monotonic() + args.seconds
+
+    # Соединения закрыты выше: каждый процесс откроет свои.
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=read, args=(results, client, prefix, number, args, stop)
+        )
+        for number, (client, prefix) in enumerate(readers)
+    ] + [
+        context.Process(target=write, args=(results, client, stop))
+        for client, _ in writers
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    counters = Counter()
+    read_timings = []
+    for _ in processes:
+        local, timings = results.get()
+        counters.update(local)
+        read_timings.extend(timings)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    read_timings.sort()
+    print(json.dumps({
+        'replicas': len(settings.NOTES_DB_REPLICAS),
+        'profile': os.environ.get('YANOTE_DB_PROFILE', 'default'),
+        'seconds': round(elapsed, 2),
+        'reads_per_second': round(counters['read'] / elapsed, 1),
+        'writes_per_second': round(counters['write'] / elapsed, 1),
+        'read_p95_ms': round(
+            read_timings[int(len(read_timings) * 0.95) - 1], 3
+        ) if read_timings else None,
+        **counters,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--replicas', type=int, default=3,
+                        help='Наибольшее число реплик.')
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--notes', type=int, default=1000,
+                        help='Заметок у каждого читателя перед тестом.')
+    parser.add_argument('--profile', choices=('default', 'production'),
+                        default='default',
+                        help='Профиль SQLite (YANOTE_DB_PROFILE).')
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args)
+        return
+
+    results = []
+    for replicas in range(args.replicas + 1):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            env = dict(
+                os.environ,
+                YANOTE_DB_PROFILE=args.profile,
+                YANOTE_DB_PATH=str(directory / 'primary.sqlite3'),
+                # Метки чтения с основной базы общие для всех процессов.
+                YANOTE_FILE_CACHE_DIR=str(directory / 'cache'),
+                YANOTE_DB_REPLICAS=','.join(
+                    str(directory / f'replica_{number}.sqlite3')
+                    for number in range(1, replicas + 1)
+                ),
+            )
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.replicas', '--worker',
+                 *sys.argv[1:]],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(output.splitlines()[-1]))
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Рост истории заметки и время восстановления версии.
+
+Заметка правится --edits раз, каждая правка меняет или добавляет
+несколько строк. Для каждого шага снимков сравнивается объём истории с
+хранением полных копий текста (как есть и сжатых zlib), а также время
+записи ревизии и восстановления случайной версии.
+
+    python -m benchmarks.revisions --edits 1000 --snapshot-every 10 50 100
+"""
+import argparse
+import random
+import time
+import zlib
+
+from .utils import create_user, measure, report, setup_django
+
+LINES = 400
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--edits', type=int, default=1000)
+    parser.add_argument('--snapshot-every', type=int, nargs='+',
+                        default=[10, 50, 100])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db.models import Sum
+    from django.db.models.functions import Length
+    from django.test.utils import override_settings
+
+    from notes import revisions
+    from notes.models import Note
+
+    author = create_user('bench')
+    results = []
+    for every in args.snapshot_every:
+        rng = random.Random(0)
+        lines = [
+            f'{number}: ' + ' '.join(
+                rng.choice(('лог', 'запрос', 'ответ', 'ошибка', 'время'))
+                for _ in range(8)
+            )
+            for number in range(LINES)
+        ]
+        with override_settings(NOTES_REVISION_SNAPSHOT_EVERY=every):
+            note = Note.objects.create(
+                title='Журнал', text='\n'.join(lines), author=author,
+                slug=f'log-{every}',
+            )
+            full_bytes = compressed_bytes = 0
+            started = time.perf_counter()
+            for number in range(args.edits):
+                for _ in range(rng.randint(1, 3)):
+                    position = rng.randrange(len(lines) + 1)
+                    if position == len(lines) or rng.random() < 0.3:
+                        lines.insert(position, f'добавлено в правке {number}')
+                    else:
+                        lines[position] = f'изменено в правке {number}'
+                note.text = '\n'.join(lines)
+                note.save()
+                full_bytes += len(note.text.encode())
+                compressed_bytes += len(zlib.compress(note.text.encode()))
+            record_ms = (time.perf_counter() - started) * 1000 / args.edits
+
+            history = note.revisions.all()
+            stored = history.aggregate(size=Sum(Length('data')))['size']
+            count = history.count()
+            newest = measure(
+                lambda: revisions.reconstruct(note, count), args.repeat
+            )
+            random_version = measure(
+                lambda: revisions.reconstruct(note, rng.randint(1, count)),
+                args.repeat,
+            )
+        results.append({
+            'snapshot_every': every,
+            'revisions': count,
+            'final_text_bytes': len(note.text.encode()),
+            'history_bytes': stored,
+            'full_copies_bytes': full_bytes,
+            'compressed_copies_bytes': compressed_bytes,
+            'save_with_revision_ms': round(record_ms, 3),
+            'reconstruct_newest_p95_ms': newest['p95_ms'],
+            'reconstruct_random_p50_ms': random_version['p50_ms'],
+            'reconstruct_random_p95_ms': random_version['p95_ms'],
+        })
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Задержка поиска FTS5 против title__icontains при росте числа заметок.
+
+Запуск:
+
+    python -m benchmarks.search --notes 1000 10000 100000 1000000
+"""
+import argparse
+import random
+
+from .utils import create_user, measure, report, setup_django
+
+WORDS = (
+    'отчёт', 'встреча', 'бюджет', 'проект', 'задача', 'идея', 'покупки',
+    'рецепт', 'книга', 'фильм', 'поездка', 'звонок', 'письмо', 'список',
+    'план', 'неделя', 'месяц', 'команда', 'релиз', 'ошибка', 'сервер',
+)
+# Слово, которое встречается только в нескольких заметках каждого автора.
+RARE_WORD = 'гиперкуб'
+RARE_EVERY = 10_000
+BATCH_SIZE = 5000
+
+
+def seed(author, count, rng):
+    from django.db import connection
+
+    from notes.models import Note
+    from notes.search import FTS_TABLE
+
+    for start in range(0, count, BATCH_SIZE):
+        notes = []
+        for number in range(start, min(start + BATCH_SIZE, count)):
+            words = rng.choices(WORDS, k=40)
+            if number % RARE_EVERY == 0:
+                words.append(RARE_WORD)
+            notes.append(Note(
+                title=' '.join(words[:3]),
+                text=' '.join(words[3:]),
+                slug=f'u{author.pk}-{number}',
+                author=author,
+            ))
+        Note.objects.bulk_create(notes)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, owner, title, text) '
+            f"SELECT id, 'a' || author_id, title, text FROM notes_note "
+            f'WHERE author_id = %s',
+            [author.pk],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, nargs='+',
+                        default=[1000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from notes import search
+    from notes.models import Note
+
+    rng = random.Random(0)
+    results = []
+    for count in args.notes:
+        author = create_user(f'bench-{count}')
+        seed(author, count, rng)
+        queryset = Note.objects.filter(author=author)
+        for word in (RARE_WORD, 'бюдж'):
+            cases = {
+                'fts5': lambda: search.search(queryset, author.pk, word, 21),
+                'title_icontains': lambda: list(
+                    queryset.filter(title__icontains=word)
+                    .only('id', 'title', 'slug')[:21]
+                ),
+                'text_icontains': lambda: list(
+                    queryset.filter(text__icontains=word)
+                    .only('id', 'title', 'slug')[:21]
+                ),
+            }
+            for name, func in cases.items():
+                stats = measure(func, args.repeat)
+                stats.update(case=name, notes=count, query=word)
+                results.append(stats)
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
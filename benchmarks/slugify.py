@@ -0,0 +1,76 @@
+"""Транслитерация заголовков: pytils, таблица str.translate и LRU-кэш.
+
+Запуск:
+
+    python -m benchmarks.slugify --titles 100000 --unique 3000
+"""
+import argparse
+import random
+import time
+from functools import lru_cache
+
+from pytils.translit import slugify as pytils_slugify
+
+from notes.translit import slugify as table_slugify
+
+from .utils import report
+
+WORDS = (
+    'заметка', 'список', 'покупок', 'встреча', 'с', 'командой', 'план',
+    'на', 'неделю', 'отчёт', 'идеи', 'для', 'проекта', 'Ёлка', 'щука',
+    'чтение', 'книги', 'журнал', 'тренировок', 'рецепт', 'борща', 'задачи',
+    '№', '«важно»', '—', 'и', 'т.д.', 'Москва', 'Санкт-Петербург', '2024',
+)
+
+
+def make_corpus(total, unique, seed=0):
+    """Корпус из total заголовков, среди которых unique различных."""
+    rng = random.Random(seed)
+    titles = [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+        for _ in range(unique)
+    ]
+    return [rng.choice(titles) for _ in range(total)]
+
+
+def run(func, corpus):
+    started = time.perf_counter()
+    for title in corpus:
+        func(title)
+    elapsed = time.perf_counter() - started
+    return {
+        'seconds': round(elapsed, 4),
+        'titles_per_second': round(len(corpus) / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=100_000)
+    parser.add_argument('--unique', type=int, default=3_000)
+    parser.add_argument('--cache-size', type=int, default=4096)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.titles, args.unique)
+    mismatches = sum(
+        pytils_slugify(title) != table_slugify(title) for title in set(corpus)
+    )
+    results = {
+        'titles': args.titles,
+        'unique_titles': args.unique,
+        'mismatches': mismatches,
+    }
+    for name, func in (
+        ('pytils', pytils_slugify),
+        ('table', table_slugify),
+    ):
+        results[name] = run(func, corpus)
+        cached = lru_cache(maxsize=args.cache_size)(func)
+        results[f'{name}_cached'] = run(cached, corpus)
+        results[f'{name}_cached']['hits'] = cached.cache_info().hits
+        results[f'{name}_cached']['misses'] = cached.cache_info().misses
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Нагрузочный тест SQLite: профиль по умолчанию против production.
+
+Для каждого профиля запускается отдельный процесс со своей базой в
+файле. Потоки-клиенты смешивают чтение (список и заметка) с записью
+(создание заметки через форму); кэш страниц отключён, чтобы нагрузка
+доходила до базы.
+
+    python -m benchmarks.sqlite_load --threads 8 --seconds 10 --writes 0.2
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from .utils import report
+
+PROFILES = ('default', 'production')
+
+
+def send_request(client, prefix, rng, args):
+    """Случайный запрос клиента: пара (вид запроса, ответ)."""
+    from django.urls import reverse
+
+    if rng.random() < args.writes:
+        return 'write', client.post(reverse('notes:add'), {
+            'title': 'Заметка под нагрузкой', 'text': 'Текст',
+        })
+    if rng.random() < 0.5:
+        return 'list', client.get(reverse('notes:list'))
+    slug = f'{prefix}{rng.randrange(args.notes)}'
+    return 'detail', client.get(reverse('notes:detail', args=(slug,)))
+
+
+def run_worker(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.db import OperationalError, connection
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from .utils import create_user, seed_notes
+
+    override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }}).enable()
+    call_command('migrate', verbosity=0)
+    clients = []
+    for number in range(args.threads):
+        user = create_user(f'load-{number}')
+        seed_notes(user, args.notes)
+        client = Client()
+        client.force_login(user)
+        clients.append((client, f'u{user.pk}-'))
+    connection.close()
+
+    stop = time.monotonic() + args.seconds
+    counters = Counter()
+    lock = threading.Lock()
+
+    def work(client, prefix, seed):
+        rng = random.Random(seed)
+        local = Counter()
+        while time.monotonic() < stop:
+            try:
+                kind, response = send_request(client, prefix, rng, args)
+                local[kind] += 1
+                if response.status_code >= 400:
+                    local['http_errors'] += 1
+            except OperationalError as error:
+                local['locked' if 'locked' in str(error) else 'db_errors'] += 1
+        connection.close()
+        with lock:
+            counters.update(local)
+
+    threads = [
+        threading.Thread(target=work, args=(client, prefix, number))
+        for number, (client, prefix) in enumerate(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    requests = counters['write'] + counters['list'] + counters['detail']
+    print(json.dumps({
+        'profile': os.environ.get('YANOTE_DB_PROFILE', 'default'),
+        'seconds': round(elapsed, 2),
+        'requests_per_second': round(requests / elapsed, 1),
+        'writes_per_second': round(counters['write'] / elapsed, 1),
+        **counters,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writes', type=float, default=0.2,
+                        help='Доля запросов на запись.')
+    parser.add_argument('--notes', type=int, default=1000,
+                        help='Заметок у каждого клиента перед тестом.')
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args)
+        return
+
+    results = []
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                YANOTE_DB_PROFILE=profile,
+                YANOTE_DB_PATH=str(Path(directory) / 'load.sqlite3'),
+            )
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.sqlite_load', '--worker',
+                 *sys.argv[1:]],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(output.splitlines()[-1]))
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
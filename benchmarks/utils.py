@@ -0,0 +1,62 @@
+"""Общие помощники для бенчмарков YaNote.
+
+Бенчмарки запускаются из корня проекта как модули, например:
+    python -m benchmarks.list_pagination --notes 10000 100000
+Каждый из них поднимает отдельную тестовую базу и не трогает db.sqlite3.
+"""
+import json
+import os
+import statistics
+import time
+
+
+def setup_django():
+    """Настраивает Django и создаёт чистую тестовую базу."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    django.setup()
+    from django.db import connection
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def create_user(username):
+    from django.contrib.auth import get_user_model
+    return get_user_model().objects.create(username=username)
+
+
+def seed_notes(author, count, text_size=2000, batch_size=5000):
+    """Быстро создаёт count заметок автора, минуя Note.save."""
+    from notes.models import Note
+    text = ('Текст заметки. ' * (text_size // 15 + 1))[:text_size]
+    prefix = f'u{author.pk}-'
+    for start in range(0, count, batch_size):
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {number}',
+                text=text,
+                slug=f'{prefix}{number}',
+                author=author,
+            )
+            for number in range(start, min(start + batch_size, count))
+        )
+
+
+def measure(func, repeat=20):
+    """Возвращает статистику времени выполнения func в миллисекундах."""
+    func()  # Прогрев: кэши шаблонов, подготовленные запросы.
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(timings[len(timings) // 2], 3),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+        'repeat': repeat,
+    }
+
+
+def report(result):
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -1,5 +1,120 @@
-from django.contrib import admin
+"""Админка заметок, рассчитанная на миллионы строк.
 
-from .models import Note
+- список не загружает тексты, автора берёт тем же запросом через JOIN;
+- автор в форме вводится по id, а не выбирается из всех пользователей;
+- поиск идёт по индексу FTS по заголовку и адресу (см. notes.search);
+- заметки в списке считаются не дальше NOTES_ADMIN_COUNT_LIMIT;
+- массовые действия идут пачками по NOTES_ADMIN_BATCH_SIZE, каждая
+  пачка — в своей короткой транзакции.
+"""
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils.functional import cached_property
 
-admin.site.register(Note)
+from . import search
+from .forms import NoteForm
+from .models import ALIVE, Note
+
+
+class LimitedCountPaginator(Paginator):
+    """Считает строки не дальше NOTES_ADMIN_COUNT_LIMIT.
+
+    COUNT(*) без предела читает всю таблицу. Дальше предела список не
+    листается: нужные заметки находят поиском и фильтром.
+    """
+
+    @cached_property
+    def count(self):
+        return self.object_list[:settings.NOTES_ADMIN_COUNT_LIMIT].count()
+
+
+class DeletedFilter(admin.SimpleListFilter):
+    title = 'удалена'
+    parameter_name = 'deleted'
+
+    def lookups(self, request, model_admin):
+        return (('no', 'Нет'), ('yes', 'Да'))
+
+    def queryset(self, request, queryset):
+        if self.value() == 'no':
+            return queryset.filter(ALIVE)
+        if self.value() == 'yes':
+            # Частичный индекс note_deleted_idx.
+            return queryset.filter(deleted__isnull=False)
+        return queryset
+
+
+def pk_batches(queryset):
+    """Идентификаторы заметок queryset пачками по NOTES_ADMIN_BATCH_SIZE."""
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:settings.NOTES_ADMIN_BATCH_SIZE]
+        )
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    form = NoteForm
+    fields = ('title', 'text', 'slug', 'folder_name', 'tag_names', 'author')
+    raw_id_fields = ('author',)
+    list_display = ('id', 'title', 'slug', 'author', 'updated', 'deleted')
+    list_select_related = ('author',)
+    list_filter = (DeletedFilter,)
+    search_fields = ('title', 'slug')
+    search_help_text = 'Слова из заголовка или адреса, можно начало слова.'
+    ordering = ('-pk',)
+    # Сортировка по колонкам — это сортировка всей таблицы.
+    sortable_by = ()
+    show_full_result_count = False
+    paginator = LimitedCountPaginator
+    actions = ('soft_delete_notes', 'restore_notes')
+
+    def get_queryset(self, request):
+        """Видны и удалённые заметки: их можно вернуть до purge_notes."""
+        return self.model.all_objects.order_by(*self.get_ordering(request))
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search.filter_by_title(queryset, search_term), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Стандартное удаление собирает для подтверждения все связанные
+        # объекты и удаляет заметки по одной; строки удаляет purge_notes.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Удалить выбранные заметки',
+                  permissions=('delete',))
+    def soft_delete_notes(self, request, queryset):
+        deleted = 0
+        for pks in pk_batches(queryset):
+            with transaction.atomic():
+                deleted += Note.all_objects.filter(pk__in=pks).soft_delete()
+        self.message_user(
+            request, f'Удалено заметок: {deleted}.', messages.SUCCESS
+        )
+
+    @admin.action(description='Восстановить выбранные заметки',
+                  permissions=('change',))
+    def restore_notes(self, request, queryset):
+        restored = 0
+        for pks in pk_batches(queryset.filter(deleted__isnull=False)):
+            with transaction.atomic():
+                for note in Note.all_objects.filter(
+                    pk__in=pks
+                ).select_related('body'):
+                    note.restore()
+                    restored += 1
+        self.message_user(
+            request, f'Восстановлено заметок: {restored}.', messages.SUCCESS
+        )
@@ -0,0 +1,302 @@
+"""JSON API заметок: /api/notes/.
+
+Доступ тот же, что у страниц: вход через сессию, только свои заметки
+(см. NoteBase). Запись защищена CSRF, как и формы: токен из cookie
+csrftoken передаётся в заголовке X-CSRFToken, получить его достаточно
+один раз.
+
+- GET /api/notes/?cursor=&limit=&fields=id,title — страница списка по
+  курсору (next и previous в ответе);
+- GET /api/notes/<slug>/?fields= — одна заметка;
+- POST /api/notes/batch/create/ {"notes": [{title, text, slug}, ...]};
+- POST /api/notes/batch/update/ {"notes": [{id, и изменяемые поля}, ...]};
+- POST /api/notes/batch/delete/ {"ids": [...]}.
+
+Пакет — не больше NOTES_API_BATCH_SIZE заметок и одна транзакция: если
+хоть одна заметка не прошла проверку NoteForm, не сохраняется ни одна,
+а в ответе 400 ошибки по номерам заметок в пакете.
+"""
+import json
+from http import HTTPStatus
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views import View
+
+from .forms import NoteForm
+from .models import Note
+from .pagination import InvalidCursor, KeysetPaginator
+from .views import NoteBase, save_note_form
+
+API_FIELDS = ('id', 'title', 'slug', 'text', 'created', 'updated')
+NOT_FOUND = 'Заметка не найдена.'
+INVALID_ID = 'id должен быть целым числом.'
+NOT_STRING = 'Ожидается строка.'
+# Целые за этими пределами не помещаются в колонку id базы.
+ID_RANGE = range(-2 ** 63, 2 ** 63)
+
+
+class ApiError(Exception):
+    """Ошибка запроса, которую API отдаёт клиенту в JSON."""
+
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_fields(request):
+    """Поля из ?fields=a,b в порядке запроса; по умолчанию все."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return API_FIELDS
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in API_FIELDS]
+    if unknown or not fields:
+        raise ApiError(
+            f'Неизвестные поля: {", ".join(unknown)}. '
+            f'Доступны: {", ".join(API_FIELDS)}.'
+        )
+    return fields
+
+
+def select_fields(queryset, fields):
+    """Загружает только нужные колонки; текст — только если он нужен."""
+    columns = ['id', *(
+        name for name in fields if name not in ('id', 'text')
+    )]
+    if 'text' in fields:
+        queryset = queryset.select_related('body')
+        columns += ['body__text', 'body__text_zlib']
+    return queryset.only(*columns)
+
+
+def is_id(value):
+    """Может ли value из JSON быть id заметки; true и false — не id."""
+    return (
+        isinstance(value, int) and not isinstance(value, bool)
+        and value in ID_RANGE
+    )
+
+
+def serialize(note, fields):
+    return {name: getattr(note, name) for name in fields}
+
+
+def form_errors(form):
+    return {
+        field: [error['message'] for error in errors]
+        for field, errors in form.errors.get_json_data().items()
+    }
+
+
+class NoteApiBase(NoteBase, View):
+    """Ответы в JSON, в том числе для ошибок и анонимных запросов."""
+
+    def handle_no_permission(self):
+        return JsonResponse(
+            {'error': 'Требуется вход.'}, status=HTTPStatus.UNAUTHORIZED
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=error.status)
+        except Http404:
+            return JsonResponse(
+                {'error': NOT_FOUND}, status=HTTPStatus.NOT_FOUND
+            )
+
+
+class NoteApiList(NoteApiBase):
+    """Список заметок по курсору."""
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', settings.NOTES_PER_PAGE))
+        except ValueError:
+            raise ApiError('limit должен быть числом.')
+        if not 1 <= limit <= settings.NOTES_API_BATCH_SIZE:
+            raise ApiError(
+                f'limit должен быть от 1 до {settings.NOTES_API_BATCH_SIZE}.'
+            )
+        return limit
+
+    def get(self, request, *args, **kwargs):
+        fields = parse_fields(request)
+        paginator = KeysetPaginator(
+            select_fields(self.get_queryset(), fields), self.get_limit()
+        )
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise ApiError('Некорректный курсор страницы.')
+        return JsonResponse({
+            'results': [serialize(note, fields) for note in page],
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        })
+
+
+class NoteApiDetail(NoteApiBase):
+    """Одна заметка по адресу."""
+
+    def get(self, request, *args, **kwargs):
+        fields = parse_fields(request)
+        note = get_object_or_404(
+            select_fields(self.get_queryset(), fields), slug=kwargs['slug']
+        )
+        return JsonResponse(serialize(note, fields))
+
+
+class NoteApiBatch(NoteApiBase):
+    """Пакетная операция: разбор тела, лимит и общая транзакция."""
+    items_key = 'notes'
+    success_status = HTTPStatus.OK
+
+    def get_items(self):
+        try:
+            payload = json.loads(self.request.body)
+        except (ValueError, UnicodeDecodeError):
+            raise ApiError('Тело запроса — не JSON.')
+        items = (
+            payload.get(self.items_key) if isinstance(payload, dict) else None
+        )
+        if not isinstance(items, list) or not items:
+            raise ApiError(f'Ожидается непустой список {self.items_key}.')
+        if len(items) > settings.NOTES_API_BATCH_SIZE:
+            raise ApiError(
+                f'В пакете больше {settings.NOTES_API_BATCH_SIZE} заметок.',
+                status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
+        return items
+
+    def process(self, items):
+        """Выполняет операцию; пара (данные ответа, ошибки по номерам)."""
+        raise NotImplementedError
+
+    def post(self, request, *args, **kwargs):
+        items = self.get_items()
+        with transaction.atomic():
+            result, errors = self.process(items)
+            if errors:
+                transaction.set_rollback(True)
+        if errors:
+            return JsonResponse(
+                {'errors': errors}, status=HTTPStatus.BAD_REQUEST
+            )
+        return JsonResponse(result, status=self.success_status)
+
+
+class NoteApiFormBatch(NoteApiBatch):
+    """Создание и правка: каждая заметка проверяется NoteForm."""
+
+    def get_instances(self, items):
+        """Заметка для каждого элемента пакета или None."""
+        raise NotImplementedError
+
+    def get_data(self, item, note):
+        return {
+            name: item[name] for name in NoteForm.Meta.fields if name in item
+        }
+
+    def get_type_errors(self, item):
+        """Поля формы не строками: форма сохранила бы их repr."""
+        return {
+            name: [NOT_STRING] for name in NoteForm.Meta.fields
+            if name in item and not isinstance(item[name], str)
+        }
+
+    def process(self, items):
+        fields = parse_fields(self.request)
+        notes, errors = [], {}
+        for index, (item, note) in enumerate(
+            zip(items, self.get_instances(items))
+        ):
+            if not isinstance(item, dict):
+                errors[index] = {'__all__': ['Ожидается объект.']}
+                continue
+            if note is None:
+                errors[index] = {'id': [NOT_FOUND]}
+                continue
+            if type_errors := self.get_type_errors(item):
+                errors[index] = type_errors
+                continue
+            form = NoteForm(self.get_data(item, note), instance=note)
+            # Пакет с ошибкой откатится целиком, но остальные заметки всё
+            # равно записываются: занятый slug виден только при записи,
+            # а клиенту нужны все ошибки за один запрос.
+            if not form.is_valid() or not save_note_form(form):
+                errors[index] = form_errors(form)
+            notes.append(note)
+        return {'results': [serialize(note, fields) for note in notes]}, errors
+
+
+class NoteApiBatchCreate(NoteApiFormBatch):
+    success_status = HTTPStatus.CREATED
+
+    def get_instances(self, items):
+        return [Note(author=self.request.user) for _ in items]
+
+
+class NoteApiBatchUpdate(NoteApiFormBatch):
+    """Правка; поля, которых нет в элементе, остаются прежними.
+
+    Папку и теги API не меняет: форма получает их текущие значения.
+    """
+
+    def process(self, items):
+        # Элементы, которые не объекты, отмечает общая проверка.
+        errors = {
+            index: {'id': [INVALID_ID]}
+            for index, item in enumerate(items)
+            if isinstance(item, dict) and not is_id(item.get('id'))
+        }
+        if errors:
+            return None, errors
+        return super().process(items)
+
+    def get_instances(self, items):
+        ids = [item['id'] for item in items if isinstance(item, dict)]
+        notes = self.get_queryset().select_related(
+            'body', 'folder'
+        ).prefetch_related('tags').in_bulk(ids)
+        return [
+            notes.get(item.get('id')) if isinstance(item, dict) else None
+            for item in items
+        ]
+
+    def get_data(self, item, note):
+        return {
+            'title': note.title, 'text': note.text, 'slug': note.slug,
+            'folder_name': note.folder.name if note.folder_id else '',
+            'tag_names': note.get_tag_names(),
+            **super().get_data(item, note),
+        }
+
+
+class NoteApiBatchDelete(NoteApiBatch):
+    """Мягкое удаление одним UPDATE вместо сохранения каждой заметки."""
+    items_key = 'ids'
+
+    def process(self, items):
+        errors = {
+            index: {'id': [INVALID_ID]}
+            for index, pk in enumerate(items) if not is_id(pk)
+        }
+        if errors:
+            return None, errors
+        found = set(self.get_queryset().filter(
+            pk__in=items
+        ).values_list('pk', flat=True))
+        errors = {
+            index: {'id': [NOT_FOUND]}
+            for index, pk in enumerate(items) if pk not in found
+        }
+        if errors:
+            return None, errors
+        return {'deleted': Note.objects.filter(pk__in=found).soft_delete()}, {}
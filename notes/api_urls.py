@@ -0,0 +1,22 @@
+from django.urls import path
+
+from notes import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('', api.NoteApiList.as_view(), name='notes'),
+    path(
+        'batch/create/', api.NoteApiBatchCreate.as_view(),
+        name='batch_create'
+    ),
+    path(
+        'batch/update/', api.NoteApiBatchUpdate.as_view(),
+        name='batch_update'
+    ),
+    path(
+        'batch/delete/', api.NoteApiBatchDelete.as_view(),
+        name='batch_delete'
+    ),
+    path('<slug:slug>/', api.NoteApiDetail.as_view(), name='note'),
+]
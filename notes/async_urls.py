@@ -0,0 +1,34 @@
+from django.urls import path
+
+from notes import async_views, views
+
+app_name = 'notes'
+
+urlpatterns = [
+    path('', views.Home.as_view(), name='home'),
+    path('add/', async_views.AsyncNoteCreate.as_view(), name='add'),
+    path(
+        'edit/<slug:slug>/', async_views.AsyncNoteUpdate.as_view(),
+        name='edit'
+    ),
+    path(
+        'note/<slug:slug>/', async_views.AsyncNoteDetail.as_view(),
+        name='detail'
+    ),
+    path(
+        'note/<slug:slug>/history/', views.NoteRevisions.as_view(),
+        name='revisions'
+    ),
+    path(
+        'note/<slug:slug>/history/<int:number>/',
+        views.NoteRevisionDetail.as_view(), name='revision'
+    ),
+    path(
+        'delete/<slug:slug>/', async_views.AsyncNoteDelete.as_view(),
+        name='delete'
+    ),
+    path('notes/', async_views.AsyncNotesList.as_view(), name='list'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('metrics/', views.metrics_report, name='metrics'),
+]
@@ -0,0 +1,210 @@
+"""Асинхронные версии страниц заметок.
+
+Подключаются вместо notes.views, когда проект запущен под ASGI (см.
+settings.NOTES_ASYNC_VIEWS). Чтение идёт через асинхронный интерфейс
+ORM, а запись выполняется одним переходом в синхронный поток:
+transaction.atomic в асинхронном коде недоступен. Шаблоны отрисовывает
+сам ASGI-обработчик, поэтому представления возвращают TemplateResponse.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from . import caching
+from .forms import NoteForm
+from .models import Folder, Note
+from .pagination import InvalidCursor, KeysetPaginator
+from .views import (
+    filter_notes, list_context, note_etag, note_validators, save_note_form
+)
+
+
+class AsyncNoteBase(View):
+    """Базовый класс: только для вошедших, только свои заметки."""
+    model = Note
+    success_url = reverse_lazy('notes:success')
+    template_name = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return self.model.objects.filter(author=self.request.user)
+
+    async def get_note(self):
+        try:
+            return await self.get_queryset().aget(slug=self.kwargs['slug'])
+        except self.model.DoesNotExist:
+            raise Http404('Заметка не найдена.')
+
+    def render(self, context):
+        return TemplateResponse(self.request, self.template_name, context)
+
+
+class AsyncPageMixin:
+    """Условный ответ и кэш страниц, как у синхронных представлений."""
+    cache_name = None
+
+    async def get_validators(self):
+        raise NotImplementedError
+
+    async def get_page_response(self):
+        raise NotImplementedError
+
+    async def get(self, request, *args, **kwargs):
+        etag, last_modified = caching.prepare_validators(
+            *await self.get_validators()
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            key = await caching.apage_key(request, self.cache_name)
+            content = await caching.aget_page(key)
+            if content is not None:
+                response = HttpResponse(content)
+            else:
+                response = caching.store_on_render(
+                    await self.get_page_response(), key
+                )
+        return caching.set_validators(response, etag, last_modified)
+
+
+class AsyncNotesList(AsyncPageMixin, AsyncNoteBase):
+    """Список заметок пользователя."""
+    cache_name = 'list'
+    template_name = 'notes/list.html'
+    paginate_by = settings.NOTES_PER_PAGE
+    page_kwarg = 'cursor'
+
+    async def get_validators(self):
+        return caching.page_etag(
+            self.request, self.cache_name,
+            await caching.aget_version(self.request.user.pk),
+        ), None
+
+    async def get_page_response(self):
+        queryset, filters = filter_notes(self.get_queryset(), self.request.GET)
+        paginator = KeysetPaginator(
+            queryset.only('id', 'title', 'slug').prefetch_related('tags'),
+            self.paginate_by,
+        )
+        try:
+            page = await paginator.apage(
+                self.request.GET.get(self.page_kwarg)
+            )
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы.')
+        notes = list(page)
+        folders = [
+            folder async for folder in Folder.objects.filter(
+                author=self.request.user
+            )
+        ]
+        return self.render({
+            **list_context(filters, folders),
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': notes,
+            'notes': notes,
+        })
+
+
+class AsyncNoteDetail(AsyncPageMixin, AsyncNoteBase):
+    """Заметка подробно."""
+    cache_name = 'detail'
+    template_name = 'notes/detail.html'
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('body')
+
+    async def get_validators(self):
+        validators = await note_validators(
+            self.get_queryset(), self.kwargs['slug']
+        ).afirst()
+        if validators is None:
+            raise Http404('Заметка не найдена.')
+        pk, updated = validators
+        user_id = self.request.user.pk
+        return note_etag(
+            user_id, await caching.aget_version(user_id), pk, updated
+        ), updated
+
+    async def get_page_response(self):
+        note = await self.get_note()
+        return self.render({'object': note, 'note': note})
+
+
+class AsyncNoteFormMixin(AsyncNoteBase):
+    """Общее для создания и редактирования заметки."""
+    template_name = 'notes/form.html'
+    form_class = NoteForm
+
+    async def get_instance(self):
+        raise NotImplementedError
+
+    def save_form(self, form):
+        """Проверка и запись формы за один переход в синхронный поток."""
+        return form.is_valid() and save_note_form(form)
+
+    def render_form(self, form):
+        return self.render({'form': form, 'object': form.instance})
+
+    async def get(self, request, *args, **kwargs):
+        return self.render_form(
+            self.form_class(instance=await self.get_instance())
+        )
+
+    async def post(self, request, *args, **kwargs):
+        form = self.form_class(
+            request.POST, request.FILES, instance=await self.get_instance()
+        )
+        if await sync_to_async(self.save_form)(form):
+            return HttpResponseRedirect(self.success_url)
+        return self.render_form(form)
+
+
+class AsyncNoteCreate(AsyncNoteFormMixin):
+    """Добавление заметки."""
+
+    async def get_instance(self):
+        return self.model(author=self.request.user)
+
+    def render_form(self, form):
+        return self.render({'form': form})
+
+
+class AsyncNoteUpdate(AsyncNoteFormMixin):
+    """Редактирование заметки."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'body', 'folder'
+        ).prefetch_related('tags')
+
+    async def get_instance(self):
+        return await self.get_note()
+
+
+class AsyncNoteDelete(AsyncNoteBase):
+    """Удаление заметки."""
+    template_name = 'notes/delete.html'
+
+    async def get(self, request, *args, **kwargs):
+        note = await self.get_note()
+        return self.render({'object': note, 'note': note})
+
+    async def post(self, request, *args, **kwargs):
+        note = await self.get_note()
+        await sync_to_async(note.soft_delete)()
+        return HttpResponseRedirect(self.success_url)
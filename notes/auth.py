@@ -0,0 +1,52 @@
+"""Бэкенд аутентификации с кэшем пользователей.
+
+Вместе с SESSION_ENGINE = cached_db снимает оба запроса, которые
+AuthenticationMiddleware выполняет до представления: сессия и
+пользователь берутся из кэша. Пользователь хранится в кэше
+NOTES_CACHE_ALIAS не дольше NOTES_USER_CACHE_TIMEOUT секунд и удаляется
+оттуда при любом его сохранении, удалении и при выходе (см.
+notes.signals). Смена пароля — это сохранение пользователя, поэтому
+старый хеш сессии перестаёт приниматься сразу, но только в процессах с
+тем же кэшем. С кэшем в памяти процесса (по умолчанию) другие процессы
+принимают старую сессию, пока она не вытеснена из их кэша: сессия
+cached_db — до SESSION_COOKIE_AGE, пользователь — до
+NOTES_USER_CACHE_TIMEOUT. Несколько процессов должны делить кэш
+(YANOTE_FILE_CACHE_DIR).
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+from . import caching
+
+USER_KEY = 'notes:user:{user_id}'
+
+
+def forget_user(user_id):
+    """Убирает пользователя из кэша."""
+    caching.get_cache().delete(USER_KEY.format(user_id=user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кэша.
+
+    Неверные логин или пароль останавливают перебор бэкендов: ModelBackend
+    стоит в AUTHENTICATION_BACKENDS только ради старых сессий и иначе
+    повторил бы поиск пользователя и хеширование пароля.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username, password, **kwargs)
+        if user is None and password is not None:
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        cache = caching.get_cache()
+        key = USER_KEY.format(user_id=user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.NOTES_USER_CACHE_TIMEOUT)
+        return user
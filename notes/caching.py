@@ -0,0 +1,164 @@
+"""Кэш отрисованных страниц заметок пользователя.
+
+Ключ страницы содержит версию заметок пользователя. Версия хранится в
+том же кэше и увеличивается при любом изменении его заметок (см.
+notes.signals), поэтому старые страницы не нужно искать и удалять: они
+просто перестают запрашиваться и вытесняются по таймауту.
+
+Работает с любым бэкендом Django, в том числе locmem и file-based.
+"""
+import hashlib
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+VERSION_KEY = 'notes:version:{user_id}'
+PAGE_KEY = 'notes:page:{user_id}:{version}:{name}:{path}'
+HITS_KEY = 'notes:stats:hits'
+MISSES_KEY = 'notes:stats:misses'
+
+
+def get_cache():
+    return caches[settings.NOTES_CACHE_ALIAS]
+
+
+def get_version(user_id):
+    """Текущая версия заметок пользователя."""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # Версия могла быть вытеснена из кэша. Начинаем с текущего времени,
+        # чтобы не совпасть ни с одной из прежних версий.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    """Делает устаревшими все закэшированные страницы пользователя."""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+async def aget_version(user_id):
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def page_key(request, name):
+    return _format_page_key(request, name, get_version(request.user.pk))
+
+
+async def apage_key(request, name):
+    version = await aget_version(request.user.pk)
+    return _format_page_key(request, name, version)
+
+
+def _format_page_key(request, name, version):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(
+        user_id=request.user.pk, version=version, name=name, path=path
+    )
+
+
+def page_etag(request, name, version):
+    """Значение ETag страницы, не раскрывающее ключ кэша, или None.
+
+    Если кэш не хранит версию (DummyCache), она всегда None: ETag не
+    менялся бы с заметками и давал бы устаревшие ответы 304.
+    """
+    if version is None:
+        return None
+    key = _format_page_key(request, name, version)
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def get_page(key):
+    content = get_cache().get(key)
+    _count(MISSES_KEY if content is None else HITS_KEY)
+    return content
+
+
+async def aget_page(key):
+    content = await get_cache().aget(key)
+    await _acount(MISSES_KEY if content is None else HITS_KEY)
+    return content
+
+
+def set_page(key, content):
+    get_cache().set(key, content, settings.NOTES_PAGE_CACHE_TIMEOUT)
+
+
+def store_on_render(response, key):
+    """Кладёт страницу в кэш, когда шаблон будет отрисован."""
+    if response.status_code == HTTPStatus.OK:
+        response.add_post_render_callback(
+            lambda response: set_page(key, response.content)
+        )
+    return response
+
+
+def prepare_validators(etag, last_modified):
+    """Валидаторы в виде, который понимает get_conditional_response."""
+    if etag is not None:
+        etag = quote_etag(etag)
+    if last_modified is not None:
+        last_modified = int(last_modified.timestamp())
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    if etag is not None:
+        response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    # Браузер хранит страницу, но перед показом проверяет её валидатор.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+async def _acount(key):
+    cache = get_cache()
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 1, timeout=None)
+
+
+def get_stats():
+    """Число попаданий и промахов кэша страниц и доля попаданий."""
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+def reset_stats():
+    get_cache().delete_many((HITS_KEY, MISSES_KEY))
@@ -0,0 +1,37 @@
+"""Конфликты уникальных ограничений при записи.
+
+Slug заметки и номер ревизии не проверяются заранее запросом: запись
+идёт сразу, а при конфликте повторяется с другим значением. Запись
+выполняется в точке сохранения (transaction.atomic), чтобы после
+конфликта можно было повторить её внутри внешней транзакции.
+"""
+from functools import lru_cache
+
+from django.apps import apps
+
+
+def is_unique_conflict(error, constraint_name):
+    """Вызвана ли ошибка IntegrityError ограничением constraint_name.
+
+    PostgreSQL и MySQL называют в сообщении имя ограничения, а SQLite —
+    только его столбцы.
+    """
+    message = str(error)
+    return (
+        constraint_name in message
+        or message == _sqlite_message(constraint_name)
+    )
+
+
+@lru_cache
+def _sqlite_message(constraint_name):
+    for model in apps.get_models():
+        for constraint in model._meta.constraints:
+            if constraint.name == constraint_name:
+                columns = ', '.join(
+                    f'{model._meta.db_table}.'
+                    f'{model._meta.get_field(name).column}'
+                    for name in constraint.fields
+                )
+                return f'UNIQUE constraint failed: {columns}'
+    raise LookupError(f'Ограничение {constraint_name} не найдено.')
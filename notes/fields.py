@@ -0,0 +1,87 @@
+"""Текстовое поле, которое хранит большие значения сжатыми.
+
+Если текст в UTF-8 не короче NOTES_TEXT_COMPRESS_OVER байт и zlib
+действительно его уменьшает, в колонку самого поля пишется пустая
+строка, а сжатые байты — в отдельное BinaryField (compressed_field).
+Распаковка ленивая: при первом обращении к атрибуту, поэтому список
+заметок и другие запросы, которым текст не нужен, её не платят.
+
+Сжатый текст не виден фильтрам вида text__icontains.
+"""
+import zlib
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+
+def compress_text(text):
+    """Сжатый текст или None, если хранить его нужно как есть."""
+    threshold = settings.NOTES_TEXT_COMPRESS_OVER
+    if threshold is None or not text:
+        return None
+    raw = text.encode()
+    if len(raw) < threshold:
+        return None
+    data = zlib.compress(raw)
+    return data if len(data) < len(raw) else None
+
+
+def decompress_text(data):
+    return zlib.decompress(data).decode()
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """Распаковывает текст при первом чтении атрибута."""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        field = self.field
+        data = instance.__dict__
+        if field.attname not in data:
+            instance.refresh_from_db(
+                fields=[field.attname, field.compressed_field]
+            )
+        if not data[field.attname]:
+            if field.compressed_field not in data:
+                instance.refresh_from_db(fields=[field.compressed_field])
+            compressed = data[field.compressed_field]
+            if compressed is not None:
+                data[field.attname] = decompress_text(compressed)
+        return data[field.attname]
+
+    def __set__(self, instance, value):
+        data = instance.__dict__
+        data[self.field.attname] = value
+        # Новое значение заменяет сжатое; при загрузке из базы сжатые
+        # байты присваиваются уже после текста.
+        if self.field.compressed_field in data:
+            data[self.field.compressed_field] = None
+
+
+class CompressedTextField(models.TextField):
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, compressed_field, **kwargs):
+        self.compressed_field = compressed_field
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['compressed_field'] = self.compressed_field
+        return name, path, args, kwargs
+
+    def unpack(self, value, compressed):
+        """Текст по значениям обеих колонок, как они лежат в базе."""
+        if not value and compressed is not None:
+            return decompress_text(compressed)
+        return value
+
+    def pre_save(self, model_instance, add):
+        # Поле со сжатыми байтами объявлено после текста, поэтому его
+        # pre_save увидит значение, выставленное здесь.
+        text = getattr(model_instance, self.attname)
+        compressed = compress_text(text)
+        model_instance.__dict__[self.compressed_field] = compressed
+        return text if compressed is None else ''
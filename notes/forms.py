@@ -1,29 +1,82 @@
-from pytils.translit import slugify
-
 from django import forms
-from django.core.exceptions import ValidationError
 
-from .models import Note
+from .models import Folder, Note, NoteBody, Tag
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
+TAG_SEPARATOR = ','
 
 
 class NoteForm(forms.ModelForm):
     """Форма для создания или обновления заметки."""
+    # Текст хранится в NoteBody, поле формы берём оттуда.
+    text = NoteBody._meta.get_field('text').formfield()
+    # Папка и теги вводятся названиями, недостающие создаются. Имена
+    # полей не совпадают с полями модели, иначе форма и админка
+    # записали бы в них строки.
+    folder_name = forms.CharField(
+        label='Папка',
+        max_length=Folder._meta.get_field('name').max_length,
+        required=False,
+    )
+    tag_names = forms.CharField(
+        label='Теги',
+        required=False,
+        help_text='Через запятую',
+    )
 
     class Meta:
         model = Note
         fields = ('title', 'text', 'slug')
 
-    def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial.setdefault('text', self.instance.text)
+            self.initial.setdefault(
+                'folder_name',
+                self.instance.folder.name if self.instance.folder_id else '',
+            )
+            self.initial.setdefault(
+                'tag_names', self.instance.get_tag_names()
+            )
+
+    def clean_folder_name(self):
+        return self.cleaned_data['folder_name'].strip()
+
+    def clean_tag_names(self):
+        max_length = Tag._meta.get_field('name').max_length
+        names = list(dict.fromkeys(
+            name.strip()
+            for name in self.cleaned_data['tag_names'].split(TAG_SEPARATOR)
+            if name.strip()
+        ))
+        too_long = [name for name in names if len(name) > max_length]
+        if too_long:
+            raise forms.ValidationError(
+                f'Тег длиннее {max_length} символов: {too_long[0]}'
+            )
+        return names
+
+    def save(self, commit=True):
+        self.instance.text = self.cleaned_data['text']
+        name = self.cleaned_data['folder_name']
+        if not name:
+            self.instance.folder = None
+        elif self.instance.folder_id is None or (
+            self.instance.folder.name != name
+        ):
+            self.instance.folder, _ = Folder.objects.get_or_create(
+                author_id=self.instance.author_id, name=name
+            )
+        return super().save(commit)
+
+    def _save_m2m(self):
+        # Вызывается и из save(), и из save_m2m() админки после записи
+        # заметки: тегам нужен её id.
+        super()._save_m2m()
+        if 'tag_names' in self.changed_data:
+            self.instance.set_tag_names(self.cleaned_data['tag_names'])
+
+    def add_slug_error(self):
+        """Сообщает о занятом slug, обнаруженном при записи в базу."""
+        self.add_error('slug', self.cleaned_data['slug'] + WARNING)
@@ -0,0 +1,33 @@
+"""Общее для команд notes_import и notes_export."""
+import csv
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import CommandError
+
+FIELDS = ('title', 'text', 'slug', 'author')
+FORMATS = ('jsonl', 'csv')
+
+# Тексты заметок не ограничены по длине, а csv по умолчанию
+# отказывается читать поля длиннее 128 КБ.
+csv.field_size_limit(2 ** 31 - 1)
+
+
+def get_format(path, format_name):
+    """Формат из опции --format или из расширения файла."""
+    if format_name:
+        return format_name
+    for name in FORMATS:
+        if str(path).endswith(f'.{name}'):
+            return name
+    if path == '-':
+        return 'jsonl'
+    raise CommandError(f'Не удалось определить формат файла {path}, '
+                       f'укажите --format.')
+
+
+def open_stream(path, mode):
+    """Файл или stdin/stdout, если указан путь «-»."""
+    if path == '-':
+        return nullcontext(sys.stdin if 'r' in mode else sys.stdout)
+    return open(path, mode, encoding='utf-8', newline='')
@@ -0,0 +1,75 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.functions import Length
+
+from notes.fields import compress_text
+from notes.models import NoteBody
+
+# В UTF-8 символ занимает не больше четырёх байт.
+MAX_CHAR_BYTES = 4
+
+
+class Command(BaseCommand):
+    help = ('Сжимает тексты заметок, записанные до включения '
+            'NOTES_TEXT_COMPRESS_OVER, пачками, и сообщает, сколько места '
+            'сэкономлено.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между пачками в секундах, чтобы запись с сайта '
+                 'не ждала блокировку базы.'
+        )
+        parser.add_argument(
+            '--vacuum', action='store_true',
+            help='Выполнить VACUUM, чтобы SQLite вернул место файлу базы.'
+        )
+
+    def handle(self, *args, **options):
+        threshold = settings.NOTES_TEXT_COMPRESS_OVER
+        if threshold is None:
+            raise CommandError('Сжатие выключено: NOTES_TEXT_COMPRESS_OVER '
+                               'равен None.')
+        candidates = NoteBody.objects.filter(
+            text_zlib__isnull=True,
+        ).annotate(length=Length('text')).filter(
+            length__gte=threshold // MAX_CHAR_BYTES
+        ).order_by('pk')
+        last_pk = 0
+        compressed = before = after = 0
+        while True:
+            rows = list(candidates.filter(pk__gt=last_pk).values_list(
+                'pk', 'text', 'note__updated'
+            )[:options['batch_size']])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            with transaction.atomic():
+                for pk, text, updated in rows:
+                    data = compress_text(text)
+                    if data is None:
+                        continue
+                    # QuerySet.update не трогает updated, историю и кэш
+                    # страниц: текст для приложения остаётся тем же. Если
+                    # заметку успели изменить, её сожмёт следующее
+                    # сохранение.
+                    if NoteBody.objects.filter(
+                        pk=pk, note__updated=updated, text_zlib__isnull=True
+                    ).update(text='', text_zlib=data):
+                        compressed += 1
+                        before += len(text.encode())
+                        after += len(data)
+            time.sleep(options['pause'])
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+        saved = before - after
+        self.stdout.write(
+            f'Сжато заметок: {compressed}. Тексты занимали {before} байт, '
+            f'теперь {after}, сэкономлено {saved} байт '
+            f'({saved / max(before, 1):.0%}).'
+        )
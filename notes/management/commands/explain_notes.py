@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from notes import views
+from notes.pagination import KeysetPaginator
+
+
+class Command(BaseCommand):
+    help = 'Печатает EXPLAIN QUERY PLAN для запросов представлений заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help='Чьи заметки использовать в запросах (по умолчанию первый '
+                 'пользователь в базе).'
+        )
+
+    def get_user(self, username):
+        users = get_user_model().objects.order_by('pk')
+        if username:
+            users = users.filter(username=username)
+        user = users.first()
+        if user is None:
+            raise CommandError(
+                'Не найден пользователь для построения запросов.'
+            )
+        return user
+
+    def get_view(self, view_class, user):
+        view = view_class()
+        view.request = RequestFactory().get('/')
+        view.request.user = user
+        view.kwargs = {}
+        return view
+
+    def get_queries(self, user):
+        """Запросы в том виде, в каком их выполняют представления."""
+        list_queryset = self.get_view(views.NotesList, user).get_queryset()
+        paginator = KeysetPaginator(list_queryset, views.NotesList.paginate_by)
+        yield 'notes:list (граница страницы)', (
+            list_queryset.order_by('pk').values_list('pk', flat=True)
+            [paginator.per_page:paginator.per_page + 1]
+        )
+        yield 'notes:list (страница)', (
+            list_queryset.filter(pk__gt=0, pk__lt=paginator.per_page)
+            .order_by('pk')
+        )
+        for name, params in (('папка', {'folder': 1}), ('тег', {'tag': 1})):
+            queryset, _ = views.filter_notes(list_queryset, params)
+            yield f'notes:list ({name})', (
+                queryset.order_by('pk').values_list('pk', flat=True)
+                [paginator.per_page:paginator.per_page + 1]
+            )
+        yield 'notes:home', views.recent_notes(
+            self.get_view(views.NotesList, user).get_queryset()
+        )
+        for name, view_class in (
+            ('notes:detail', views.NoteDetail),
+            ('notes:edit', views.NoteUpdate),
+            ('notes:delete', views.NoteDelete),
+        ):
+            queryset = self.get_view(view_class, user).get_queryset()
+            yield name, queryset.filter(slug='slug')
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['username'])
+        for name, queryset in self.get_queries(user):
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from notes import caching
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий в кэш страниц заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help='Обнулить счётчики после вывода.')
+
+    def handle(self, *args, **options):
+        stats = caching.get_stats()
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {stats["hit_rate"]:.1%}'
+        )
+        if options['reset']:
+            caching.reset_stats()
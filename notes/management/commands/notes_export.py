@@ -0,0 +1,63 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from notes.models import Note, NoteBody
+
+from ._notes_io import FIELDS, FORMATS, get_format, open_stream
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки в JSON Lines или CSV, не загружая их в память.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл для записи или «-» для stdout.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--author', help='Выгрузить заметки одного автора.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def get_queryset(self, author):
+        queryset = Note.objects.order_by('pk').values_list(
+            'title', 'body__text', 'body__text_zlib', 'slug',
+            'author__username'
+        )
+        if author:
+            queryset = queryset.filter(author__username=author)
+        return queryset
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format_name = get_format(path, options['format'])
+        unpack = NoteBody._meta.get_field('text').unpack
+        rows = (
+            (title, unpack(text, text_zlib), slug, author)
+            for title, text, text_zlib, slug, author
+            in self.get_queryset(options['author']).iterator(
+                chunk_size=options['chunk_size']
+            )
+        )
+        started = time.perf_counter()
+        count = 0
+        with open_stream(path, 'w') as stream:
+            if format_name == 'csv':
+                writer = csv.writer(stream)
+                writer.writerow(FIELDS)
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in rows:
+                    stream.write(json.dumps(
+                        dict(zip(FIELDS, row)), ensure_ascii=False
+                    ))
+                    stream.write('\n')
+                    count += 1
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'Выгружено заметок: {count} за {elapsed:.1f} с '
+            f'({count / max(elapsed, 1e-9):.0f} в секунду).'
+        )
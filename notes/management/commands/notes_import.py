@@ -0,0 +1,100 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from notes import search
+from notes.models import Note
+from notes.slugs import allocate_bulk_slugs
+
+from ._notes_io import FORMATS, get_format, open_stream
+
+
+class Command(BaseCommand):
+    help = ('Загружает заметки из JSON Lines или CSV пачками через '
+            'bulk_create, читая файл потоком.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл для чтения или «-» для stdin.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--author',
+            help='Назначить все заметки этому пользователю вместо колонки '
+                 'author.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def read_rows(self, stream, format_name):
+        if format_name == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+    def get_author_id(self, username):
+        if username not in self.author_ids:
+            author_id = get_user_model().objects.filter(
+                username=username
+            ).values_list('pk', flat=True).first()
+            if author_id is None:
+                raise CommandError(f'Пользователь {username} не найден.')
+            self.author_ids[username] = author_id
+        return self.author_ids[username]
+
+    def make_note(self, number, row, author):
+        if not isinstance(row, dict):
+            raise CommandError(f'Строка {number}: ожидается объект.')
+        required = ('title',) if author else ('title', 'author')
+        for name in required:
+            # csv.DictReader дополняет короткие строки значениями None.
+            if row.get(name) is None:
+                raise CommandError(f'Строка {number}: нет колонки {name}.')
+        return Note(
+            title=row['title'],
+            text=row.get('text', ''),
+            slug=row.get('slug') or '',
+            author_id=self.get_author_id(author or row['author']),
+        )
+
+    def save_batch(self, batch):
+        allocate_bulk_slugs(batch)
+        try:
+            with transaction.atomic():
+                Note.objects.bulk_create(batch)
+                # bulk_create не отправляет post_save.
+                search.index_notes(batch, created=True)
+        except IntegrityError:
+            # slug успели занять параллельно: сохраняем пачку по одной
+            # заметке, подбирая свободный вариант при конфликте.
+            with transaction.atomic():
+                for note in batch:
+                    note.save_with_free_slug()
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format_name = get_format(path, options['format'])
+        self.author_ids = {}
+        started = time.perf_counter()
+        count = 0
+        with open_stream(path, 'r') as stream:
+            notes = (
+                self.make_note(number, row, options['author'])
+                for number, row in enumerate(
+                    self.read_rows(stream, format_name), 1
+                )
+            )
+            while batch := list(islice(notes, options['batch_size'])):
+                self.save_batch(batch)
+                count += len(batch)
+                if options['verbosity'] > 1:
+                    self.stderr.write(f'Загружено заметок: {count}')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Загружено заметок: {count} за {elapsed:.1f} с '
+            f'({count / max(elapsed, 1e-9):.0f} в секунду).'
+        )
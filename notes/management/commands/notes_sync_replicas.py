@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в файлы реплик '
+            'NOTES_DB_REPLICAS: реплики для локальной проверки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--every', type=float, default=None,
+            help='Повторять копирование через столько секунд; так '
+                 'реплики отстают от основной базы, как настоящие.'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.NOTES_DB_REPLICAS:
+            raise CommandError('Реплики не заданы: см. YANOTE_DB_REPLICAS.')
+        aliases = [DEFAULT_DB_ALIAS, *settings.NOTES_DB_REPLICAS]
+        if any(connections[alias].vendor != 'sqlite' for alias in aliases):
+            raise CommandError(
+                'Копировать файлы можно только у SQLite; реплики других '
+                'СУБД обновляет сама СУБД.'
+            )
+        while True:
+            self.sync()
+            if options['every'] is None:
+                return
+            time.sleep(options['every'])
+
+    def sync(self):
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        for alias in settings.NOTES_DB_REPLICAS:
+            target = connections[alias]
+            target.ensure_connection()
+            # Онлайн-копия SQLite: согласованный срез без остановки записи.
+            source.connection.backup(target.connection)
+            self.stdout.write(f'{alias}: {target.settings_dict["NAME"]}')
@@ -0,0 +1,45 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = ('Физически удаляет заметки, удалённые пользователями больше '
+            'NOTES_PURGE_AFTER_DAYS дней назад, небольшими пачками.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.NOTES_PURGE_AFTER_DAYS,
+            help='Удалять заметки, удалённые больше стольких дней назад.'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между пачками в секундах, чтобы запись с сайта '
+                 'не ждала блокировку базы.'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Частичный индекс note_deleted_idx содержит только удалённые.
+        expired = Note.all_objects.filter(deleted__lt=cutoff)
+        purged = 0
+        while True:
+            # Каждая пачка — отдельная короткая транзакция.
+            with transaction.atomic():
+                pks = list(
+                    expired.values_list('pk', flat=True)
+                    [:options['batch_size']]
+                )
+                if not pks:
+                    break
+                Note.all_objects.filter(pk__in=pks).delete()
+            purged += len(pks)
+            time.sleep(options['pause'])
+        self.stdout.write(f'Удалено заметок: {purged}.')
@@ -0,0 +1,168 @@
+"""Метрики запросов к страницам по имени URL.
+
+Для каждого имени (notes:list, notes:detail, …) копятся гистограммы числа
+SQL-запросов, времени SQL, времени отрисовки шаблона и общего времени
+ответа. Данные хранятся в памяти процесса (см. RequestMetricsMiddleware)
+и отдаются страницей notes:metrics только персоналу.
+
+Запросы к базе считает record_query: она стоит на каждом соединении
+постоянно (см. notes.signals) и передаёт запрос записи текущего ответа
+из контекстной переменной. Так параллельные ответы под ASGI, чьи
+запросы идут через общий поток и общие соединения, не считают запросы
+друг друга.
+"""
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Списки IN разной длины — один и тот же запрос.
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+UNRESOLVED = '<unresolved>'
+
+_recorder = ContextVar('notes_query_recorder', default=None)
+
+
+class Histogram:
+    """Счётчики по корзинам с верхними границами bounds."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Верхняя граница корзины, в которую попадает квантиль q."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self):
+        buckets = {str(bound): count
+                   for bound, count in zip(self.bounds, self.counts)}
+        buckets['+Inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean': round(self.sum / self.count, 3) if self.count else 0,
+            'max': round(self.max, 3),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': buckets,
+        }
+
+
+def _new_view_metrics():
+    return {
+        'queries': Histogram(QUERY_BUCKETS),
+        'sql_ms': Histogram(TIME_BUCKETS_MS),
+        'template_ms': Histogram(TIME_BUCKETS_MS),
+        'latency_ms': Histogram(TIME_BUCKETS_MS),
+    }
+
+
+_lock = threading.Lock()
+_views = {}
+
+
+def record(name, **values):
+    with _lock:
+        histograms = _views.get(name)
+        if histograms is None:
+            histograms = _views[name] = _new_view_metrics()
+        for key, value in values.items():
+            histograms[key].observe(value)
+
+
+def snapshot():
+    """Сводка по всем страницам: {имя URL: {метрика: гистограмма}}."""
+    with _lock:
+        return {
+            name: {key: histogram.as_dict()
+                   for key, histogram in histograms.items()}
+            for name, histograms in sorted(_views.items())
+        }
+
+
+def reset():
+    with _lock:
+        _views.clear()
+
+
+def query_shape(sql):
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """Обёртка connection.execute_wrapper: считает запросы и их время.
+
+    С track_shapes запоминает и сколько раз выполнялся каждый запрос,
+    чтобы найти N+1.
+    """
+
+    def __init__(self, track_shapes=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter() if track_shapes else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            if self.shapes is not None:
+                self.shapes[query_shape(sql)] += 1
+
+    def log_repeats(self, name, threshold):
+        """Пишет в лог запросы, повторённые больше threshold раз."""
+        for shape, count in self.shapes.items():
+            if count > threshold:
+                logger.warning(
+                    'N+1 в %s: запрос выполнен %d раз: %s', name, count, shape
+                )
+
+
+@contextmanager
+def recording(recorder):
+    """Запросы к базе до конца блока идут в recorder."""
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка соединений: передаёт запрос записи текущего ответа."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install(connection):
+    """Ставит record_query на соединение, если её там ещё нет."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,111 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics, routers
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RequestMetricsMiddleware:
+    """Собирает метрики каждого запроса в notes.metrics.
+
+    Стоит в начале MIDDLEWARE, поэтому в число запросов попадают и
+    запросы сессии и пользователя. Поддерживает и асинхронную цепочку,
+    чтобы под ASGI не переводить представления в синхронный поток:
+    запросы ответа попадают в его запись через контекстную переменную
+    (см. notes.metrics.recording), даже если асинхронный ORM выполняет их
+    в общем потоке вместе с запросами других ответов.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with metrics.recording(self.start(request)) as recorder:
+            response = self.get_response(request)
+        self.finish(request, recorder)
+        return response
+
+    async def __acall__(self, request):
+        with metrics.recording(self.start(request)) as recorder:
+            response = await self.get_response(request)
+        self.finish(request, recorder)
+        return response
+
+    def process_template_response(self, request, response):
+        """Засекает время отрисовки шаблона, идущей сразу после этого."""
+        started = time.perf_counter()
+
+        def rendered(response):
+            request.metrics_template_seconds = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def start(self, request):
+        request.metrics_started = time.perf_counter()
+        request.metrics_template_seconds = 0.0
+        return metrics.QueryRecorder(
+            track_shapes=bool(settings.NOTES_METRICS_N_PLUS_ONE)
+        )
+
+    def finish(self, request, recorder):
+        match = request.resolver_match
+        name = match.view_name if match else metrics.UNRESOLVED
+        metrics.record(
+            name,
+            queries=recorder.count,
+            sql_ms=recorder.seconds * 1000,
+            template_ms=request.metrics_template_seconds * 1000,
+            latency_ms=(time.perf_counter() - request.metrics_started) * 1000,
+        )
+        if settings.NOTES_METRICS_N_PLUS_ONE:
+            recorder.log_repeats(name, settings.NOTES_METRICS_N_PLUS_ONE)
+
+
+class ReplicaRoutingMiddleware:
+    """Разрешает запросу читать заметки с реплики (см. notes.routers).
+
+    Стоит после AuthenticationMiddleware: пользователь нужен, чтобы
+    проверить, не изменились ли его заметки только что. Без
+    NOTES_DB_REPLICAS ничего не делает.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.NOTES_DB_REPLICAS:
+            return self.get_response(request)
+        primary = request.method not in SAFE_METHODS or (
+            request.user.is_authenticated
+            and routers.is_pinned(request.user.pk)
+        )
+        with routers.route_request(primary):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not settings.NOTES_DB_REPLICAS:
+            return await self.get_response(request)
+        primary = request.method not in SAFE_METHODS
+        if not primary:
+            user = await request.auser()
+            primary = user.is_authenticated and (
+                await routers.ais_pinned(user.pk)
+            )
+        with routers.route_request(primary):
+            return await self.get_response(request)
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Каждый индекс строится в своей транзакции, а не в одной общей:
+    # блокировка записи держится только на время одного CREATE INDEX.
+    atomic = False
+
+    dependencies = [
+        ('notes', '0001_initial'),
+    ]
+
+    operations = [
+        # Значение по умолчанию хранится только в Python, схему не меняем,
+        # иначе SQLite пересоздал бы всю таблицу.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='note',
+                    name='title',
+                    field=models.CharField(default='Название заметки', help_text='Дайте короткое название заметке', max_length=100, verbose_name='Заголовок'),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'slug'], name='note_author_slug_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'id', 'title', 'slug'], name='note_author_list_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+from pytils.translit import slugify
+
+BATCH_SIZE = 1000
+
+
+def fill_empty_slugs(apps, schema_editor):
+    """Заполняет пустые slug, чтобы они не нарушили новое ограничение.
+
+    Пустой slug мог появиться только у заметок, сохранённых в обход
+    Note.save. Заметки обрабатываются пачками по первичному ключу, чтобы
+    не держать в памяти всю таблицу.
+    """
+    Note = apps.get_model('notes', 'Note')
+    max_length = Note._meta.get_field('slug').max_length
+    last_pk = 0
+    while True:
+        batch = list(
+            Note.objects.filter(slug='', pk__gt=last_pk)
+            .order_by('pk')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for note in batch:
+            base = slugify(note.title)[:max_length] or 'note'
+            slug, number = base, 1
+            while Note.objects.filter(
+                    author_id=note.author_id, slug=slug
+            ).exists():
+                number += 1
+                suffix = f'-{number}'
+                slug = base[:max_length - len(suffix)] + suffix
+            note.slug = slug
+            note.save(update_fields=('slug',))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_empty_slugs, migrations.RunPython.noop),
+        # Индекс заменяется уникальным ограничением по тем же колонкам.
+        migrations.RemoveIndex(
+            model_name='note',
+            name='note_author_slug_idx',
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='slug',
+            field=models.SlugField(blank=True, db_index=False, help_text='Укажите адрес для страницы заметки. Используйте только латиницу, цифры, дефисы и знаки подчёркивания', max_length=100, verbose_name='Адрес для страницы с заметкой'),
+        ),
+        migrations.AddConstraint(
+            model_name='note',
+            constraint=models.UniqueConstraint(fields=('author', 'slug'), name='note_author_slug_uniq'),
+        ),
+    ]
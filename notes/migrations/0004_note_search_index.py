@@ -0,0 +1,35 @@
+from django.db import migrations
+
+FTS_TABLE = 'notes_note_fts'
+
+
+def create_search_index(apps, schema_editor):
+    """Создаёт таблицу FTS5 и индексирует уже существующие заметки."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+        f'owner, title, text, '
+        f"tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, owner, title, text) '
+        f"SELECT id, 'a' || author_id, title, text FROM notes_note"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_author_slug_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
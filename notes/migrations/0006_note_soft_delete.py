@@ -0,0 +1,54 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:43
+
+import django.db.models.manager
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_note_timestamps'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='note',
+            options={'base_manager_name': 'all_objects'},
+        ),
+        migrations.AlterModelManagers(
+            name='note',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        # На SQLite снятие безусловного UNIQUE один раз пересобирает
+        # таблицу; частичный индекс дальше создаётся без пересборки.
+        migrations.RemoveConstraint(
+            model_name='note',
+            name='note_author_slug_uniq',
+        ),
+        migrations.RemoveIndex(
+            model_name='note',
+            name='note_author_list_idx',
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='deleted',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Удалена'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['author', 'id', 'title', 'slug'], name='note_author_list_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('deleted__isnull', False)), fields=['deleted'], name='note_deleted_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='note',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted__isnull', True)), fields=('author', 'slug'), name='note_author_slug_uniq'),
+        ),
+    ]
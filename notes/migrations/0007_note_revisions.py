@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0006_note_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер')),
+                ('snapshot', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=100, verbose_name='Заголовок')),
+                ('data', models.BinaryField()),
+                ('checksum', models.PositiveBigIntegerField()),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='notes.note')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('note', 'number'), name='note_revision_number_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:49
+
+import notes.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0007_note_revisions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='text_zlib',
+            field=models.BinaryField(null=True),
+        ),
+        # Колонка text не меняется, а AlterField на SQLite пересоздал бы
+        # всю таблицу заметок.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='note',
+                    name='text',
+                    field=notes.fields.CompressedTextField(compressed_field='text_zlib', help_text='Добавьте подробностей', verbose_name='Текст'),
+                ),
+            ],
+        ),
+    ]
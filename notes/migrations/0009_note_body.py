@@ -0,0 +1,61 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:53
+
+import django.db.models.deletion
+import notes.fields
+import notes.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0008_note_text_compression'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteBody',
+            fields=[
+                ('note', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='notes.note')),
+                ('text', notes.fields.CompressedTextField(compressed_field='text_zlib', help_text='Добавьте подробностей', verbose_name='Текст')),
+                ('text_zlib', models.BinaryField(null=True)),
+            ],
+            bases=(notes.models.LoadedValuesMixin, models.Model),
+        ),
+        migrations.RunSQL(
+            'INSERT INTO notes_notebody (note_id, text, text_zlib) '
+            'SELECT id, text, text_zlib FROM notes_note',
+            'UPDATE notes_note SET '
+            'text = (SELECT text FROM notes_notebody '
+            'WHERE note_id = notes_note.id), '
+            'text_zlib = (SELECT text_zlib FROM notes_notebody '
+            'WHERE note_id = notes_note.id)',
+        ),
+        # SQLite переписывает строки без удалённых колонок; место в файле
+        # базы освобождает VACUUM (compress_notes --vacuum). При откате
+        # колонка text возвращается с пустым значением по умолчанию, а
+        # тексты в неё копирует обратная операция выше.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE notes_note DROP COLUMN text',
+                    "ALTER TABLE notes_note ADD COLUMN text text NOT NULL "
+                    "DEFAULT ''",
+                ),
+                migrations.RunSQL(
+                    'ALTER TABLE notes_note DROP COLUMN text_zlib',
+                    'ALTER TABLE notes_note ADD COLUMN text_zlib BLOB NULL',
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveField(
+                    model_name='note',
+                    name='text',
+                ),
+                migrations.RemoveField(
+                    model_name='note',
+                    name='text_zlib',
+                ),
+            ],
+        ),
+    ]
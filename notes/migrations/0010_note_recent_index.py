@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0009_note_body'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['author', '-updated', 'title', 'slug'], name='note_author_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+from notes.fields import decompress_text
+
+FTS_TABLE = 'notes_note_fts'
+BATCH_SIZE = 1000
+
+
+def rebuild_search_index(apps, schema_editor, columns):
+    """Пересоздаёт таблицу FTS5 с колонками columns и заполняет её.
+
+    Заполняется из Python: большие тексты хранятся сжатыми.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+        f'{", ".join(columns)}, '
+        f"tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    Note = apps.get_model('notes', 'Note')
+    rows = Note.objects.filter(deleted__isnull=True).values_list(
+        'id', 'author_id', 'title', 'slug', 'body__text', 'body__text_zlib'
+    ).order_by('id')
+    insert = (
+        f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(columns)}) '
+        f'VALUES ({", ".join(["%s"] * (len(columns) + 1))})'
+    )
+    batch = []
+    with schema_editor.connection.cursor() as cursor:
+        for pk, author_id, title, slug, text, text_zlib in rows.iterator(
+            chunk_size=BATCH_SIZE
+        ):
+            values = {
+                'owner': f'a{author_id}',
+                'title': title,
+                'text': decompress_text(text_zlib) if text_zlib else text,
+                'slug': slug,
+            }
+            batch.append([pk, *(values[column] for column in columns)])
+            if len(batch) == BATCH_SIZE:
+                cursor.executemany(insert, batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert, batch)
+
+
+def add_slug(apps, schema_editor):
+    rebuild_search_index(
+        apps, schema_editor, ('owner', 'title', 'text', 'slug')
+    )
+
+
+def remove_slug(apps, schema_editor):
+    rebuild_search_index(apps, schema_editor, ('owner', 'title', 'text'))
+
+
+class Migration(migrations.Migration):
+    """Адрес заметки в поисковом индексе: для поиска в админке."""
+
+    dependencies = [
+        ('notes', '0010_note_recent_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_slug, remove_slug),
+    ]
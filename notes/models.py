@@ -1,25 +1,115 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 
-from pytils.translit import slugify
+from .fields import CompressedTextField
+from .slugs import SLUG_ATTEMPTS, add_suffix, is_slug_conflict, slugify_title
 
+# Условие для частичных индексов: только заметки, которые не удалены.
+ALIVE = models.Q(deleted__isnull=True)
 
-class Note(models.Model):
+
+class NoteQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Создаёт заметки, а следом их тексты вторым bulk_create."""
+        objs = list(objs)
+        bodies = [note.get_body() for note in objs]
+        notes = super().bulk_create(objs, *args, **kwargs)
+        NoteBody.objects.bulk_create(
+            body for body in bodies if body.note.pk is not None
+        )
+        return notes
+
+    def soft_delete(self):
+        """Прячет заметки одним UPDATE; возвращает их число.
+
+        QuerySet.update не отправляет сигналы: индекс поиска и кэш страниц
+        обновляются здесь, как это делают сигналы для Note.soft_delete.
+        """
+        from . import search
+        from .signals import invalidate_pages
+
+        notes = dict(self.filter(ALIVE).values_list('pk', 'author_id'))
+        if not notes:
+            return 0
+        self.model.all_objects.filter(pk__in=notes).update(
+            deleted=timezone.now()
+        )
+        search.unindex_notes(notes)
+        for author_id in set(notes.values()):
+            invalidate_pages(author_id)
+        return len(notes)
+
+
+class NoteManager(models.Manager.from_queryset(NoteQuerySet)):
+    """Менеджер по умолчанию: удалённые заметки не видны."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(ALIVE)
+
+
+class LoadedValuesMixin:
+    """Помнит значения полей, как они лежат в базе."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded(dict(zip(field_names, values)))
+        return instance
+
+    def remember_loaded(self, values):
+        self._loaded_values = values
+
+    def get_loaded(self, attname):
+        """Значение поля в базе или None, если оно неизвестно."""
+        values = getattr(self, '_loaded_values', {})
+        field = self._meta.get_field(attname)
+        if isinstance(field, CompressedTextField):
+            return field.unpack(
+                values.get(attname), values.get(field.compressed_field)
+            )
+        return values.get(attname)
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Сюда же приходит чтение отложенного поля.
+        super().refresh_from_db(using, fields, from_queryset)
+        names = None if fields is None else set(fields)
+        self.remember_loaded({
+            **getattr(self, '_loaded_values', {}),
+            **{
+                field.attname: self.__dict__[field.attname]
+                for field in self._meta.concrete_fields
+                if field.attname in self.__dict__ and (
+                    names is None
+                    or field.attname in names or field.name in names
+                )
+            },
+        })
+
+    def save_base(self, *args, **kwargs):
+        super().save_base(*args, **kwargs)
+        self.remember_loaded({
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        })
+
+
+class Note(LoadedValuesMixin, models.Model):
+    """Заметка; её текст хранится отдельно, в NoteBody."""
     title = models.CharField(
         'Заголовок',
         max_length=100,
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
-        'Текст',
-        help_text='Добавьте подробностей'
-    )
     slug = models.SlugField(
         'Адрес для страницы с заметкой',
         max_length=100,
-        unique=True,
         blank=True,
+        # Глобальный индекс не нужен: ищем только в паре с автором.
+        db_index=False,
         help_text=('Укажите адрес для страницы заметки. Используйте только '
                    'латиницу, цифры, дефисы и знаки подчёркивания')
     )
@@ -27,12 +117,319 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    folder = models.ForeignKey(
+        'Folder',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notes',
+        verbose_name='Папка',
+        # Вместо индекса по folder — составной note_folder_idx.
+        db_index=False,
+    )
+    tags = models.ManyToManyField(
+        'Tag', through='NoteTag', blank=True, related_name='notes',
+        verbose_name='Теги',
+    )
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    updated = models.DateTimeField('Изменена', auto_now=True)
+    # Время мягкого удаления; строку физически удаляет purge_notes.
+    deleted = models.DateTimeField(
+        'Удалена', null=True, blank=True, editable=False
+    )
+
+    objects = NoteManager()
+    all_objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        base_manager_name = 'all_objects'
+        constraints = (
+            # slug уникален среди неудалённых заметок автора; этот же
+            # индекс обслуживает поиск заметки по адресу в detail, edit
+            # и delete.
+            models.UniqueConstraint(
+                fields=('author', 'slug'),
+                condition=ALIVE,
+                name='note_author_slug_uniq',
+            ),
+        )
+        indexes = (
+            # Покрывающий индекс для списка: фильтр по автору, порядок по id
+            # (заменяет отдельный индекс author, id), а title и slug
+            # читаются прямо из индекса, без обращения к таблице.
+            models.Index(
+                fields=('author', 'id', 'title', 'slug'),
+                condition=ALIVE,
+                name='note_author_list_idx',
+            ),
+            # Последние изменённые заметки автора для домашней страницы:
+            # записи индекса уже упорядочены, поэтому запрос ничего не
+            # сортирует и читает из таблицы только выведенные строки.
+            models.Index(
+                fields=('author', '-updated', 'title', 'slug'),
+                condition=ALIVE,
+                name='note_author_recent_idx',
+            ),
+            # Список папки по курсору: фильтр по папке и порядок по id.
+            # author в индексе, чтобы планировщик без статистики выбрал
+            # его, а не индекс автора; без условия — по нему же SET_NULL
+            # при удалении папки.
+            models.Index(
+                fields=('folder', 'author', 'id'), name='note_folder_idx'
+            ),
+            # Только удалённые заметки: для purge_notes.
+            models.Index(
+                fields=('deleted',),
+                condition=models.Q(deleted__isnull=False),
+                name='note_deleted_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    @property
+    def text(self):
+        return self.get_body().text
+
+    @text.setter
+    def text(self, value):
+        self.get_body().text = value
+
+    def get_body(self):
+        """Текст заметки; у новой заметки он создаётся пустым."""
+        if self.pk is None and not Note.body.is_cached(self):
+            return NoteBody(note=self)
+        return self.body
+
+    def get_loaded(self, attname):
+        if attname == 'text':
+            # Текст меняется только через загруженный NoteBody, поэтому
+            # незагруженный NoteBody читается из базы в прежнем виде.
+            return self.get_body().get_loaded('text')
+        return super().get_loaded(attname)
+
     def save(self, *args, **kwargs):
-        if not self.slug:
+        free_slug = not self.slug
+        if free_slug:
             max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+            self.slug = slugify_title(self.title, max_slug_length)
+        if (
+            kwargs.get('update_fields') is None
+            and not args and not kwargs.get('force_insert')
+            and not self._state.adding
+        ):
+            # Загруженная заметка записывает только изменённые колонки,
+            # а без изменений не пишет ничего.
+            changed = self.get_changed_fields()
+            if not changed:
+                return
+            kwargs['update_fields'] = changed
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            # Текст лежит в NoteBody, а его правка меняет updated.
+            kwargs['update_fields'] = {*update_fields, 'updated'} - {'text'}
+        if free_slug:
+            self.save_with_free_slug(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+
+    def get_changed_fields(self):
+        """Поля, изменённые после загрузки из базы, включая text.
+
+        Незагруженные (отложенные) поля не учитываются; любое изменение
+        добавляет updated, как и полное сохранение.
+        """
+        values = getattr(self, '_loaded_values', {})
+        changed = {
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in self.__dict__
+            and (
+                field.attname not in values
+                or self.__dict__[field.attname] != values[field.attname]
+            )
+        }
+        if self.get_changed_body() is not None:
+            changed.add('text')
+        if changed:
+            changed.add('updated')
+        return changed
+
+    def save_base(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        body = self.get_changed_body() if (
+            update_fields is None or 'updated' in update_fields
+        ) else None
+        if body is None:
+            # Без транзакции: мягкое удаление и правка одних полей заметки
+            # остаются одним запросом.
+            return super().save_base(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save_base(*args, **kwargs)
+            body.save(force_insert=body._state.adding)
+
+    def get_tag_names(self):
+        """Имена тегов через запятую; берёт prefetch_related('tags')."""
+        return ', '.join(tag.name for tag in self.tags.all())
+
+    def set_tag_names(self, names):
+        """Заменяет теги заметки, создавая недостающие теги автора."""
+        Tag.objects.bulk_create(
+            (Tag(author_id=self.author_id, name=name) for name in names),
+            ignore_conflicts=True,
+        )
+        self.tags.set(
+            Tag.objects.filter(author_id=self.author_id, name__in=names)
+        )
+
+    def get_changed_body(self):
+        """Загруженный текст, если его нужно записать, иначе None."""
+        if not Note.body.is_cached(self):
+            return None
+        body = self.body
+        if body._state.adding or body.text != body.get_loaded('text'):
+            return body
+        return None
+
+    def save_with_free_slug(self, *args, **kwargs):
+        """Сохраняет заметку, при конфликте slug добавляя к нему суффикс."""
+        max_slug_length = self._meta.get_field('slug').max_length
+        base_slug = self.slug
+        for attempt in range(1, SLUG_ATTEMPTS + 1):
+            try:
+                # Точка сохранения, см. notes.conflicts.
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError as error:
+                if not is_slug_conflict(error) or attempt == SLUG_ATTEMPTS:
+                    self.slug = ''
+                    raise
+                self.slug = add_suffix(base_slug, max_slug_length)
+
+    def soft_delete(self):
+        """Прячет заметку; её slug сразу можно занять снова."""
+        self.deleted = timezone.now()
+        self.save(update_fields=('deleted',))
+
+    def restore(self):
+        """Возвращает удалённую заметку, при необходимости сменив slug."""
+        self.deleted = None
+        self.save_with_free_slug(update_fields=('deleted', 'slug'))
+
+
+class NoteBody(LoadedValuesMixin, models.Model):
+    """Текст заметки.
+
+    Вынесен из notes_note, чтобы в страницах таблицы заметок оставались
+    только короткие поля: список и поиск по адресу читают меньше страниц.
+    Текст загружают только подробная страница, редактирование и выгрузка.
+    """
+    note = models.OneToOneField(
+        Note, on_delete=models.CASCADE, primary_key=True, related_name='body'
+    )
+    text = CompressedTextField(
+        'Текст',
+        compressed_field='text_zlib',
+        help_text='Добавьте подробностей'
+    )
+    # Большой текст хранится здесь сжатым, а text пуст (см. notes.fields).
+    text_zlib = models.BinaryField(null=True, editable=False)
+
+    def __str__(self):
+        return str(self.note_id)
+
+
+class Folder(models.Model):
+    """Папка заметок автора; у заметки не больше одной папки."""
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        # Вместо индекса по author — уникальный folder_author_name_uniq.
+        db_index=False,
+    )
+    name = models.CharField('Название', max_length=100)
+
+    class Meta:
+        ordering = ('name',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('author', 'name'), name='folder_author_name_uniq',
+            ),
+        )
+
+    def __str__(self):
+        return self.name
+
+
+class Tag(models.Model):
+    """Тег заметок автора."""
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    name = models.CharField('Название', max_length=50)
+
+    class Meta:
+        ordering = ('name',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('author', 'name'), name='tag_author_name_uniq',
+            ),
+        )
+
+    def __str__(self):
+        return self.name
+
+
+class NoteTag(models.Model):
+    """Связь заметки и тега."""
+    note = models.ForeignKey(Note, on_delete=models.CASCADE)
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        # Вместо индекса по tag — уникальный note_tag_uniq.
+        db_index=False,
+    )
+
+    class Meta:
+        constraints = (
+            # Заметки тега по возрастанию id прямо из индекса: список
+            # тега по курсору не сортирует связи.
+            models.UniqueConstraint(
+                fields=('tag', 'note'), name='note_tag_uniq',
+            ),
+        )
+
+
+class NoteRevision(models.Model):
+    """Версия заметки: снимок текста или разница с предыдущей версией.
+
+    Формат хранения описан в notes.revisions.
+    """
+    note = models.ForeignKey(
+        Note, on_delete=models.CASCADE, related_name='revisions'
+    )
+    number = models.PositiveIntegerField('Номер')
+    # Номер ревизии-снимка, с которого начинается восстановление.
+    snapshot = models.PositiveIntegerField()
+    title = models.CharField('Заголовок', max_length=100)
+    data = models.BinaryField()
+    checksum = models.PositiveBigIntegerField()
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'number'), name='note_revision_number_uniq',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.note_id}#{self.number}'
+
+    @property
+    def is_snapshot(self):
+        return self.snapshot == self.number
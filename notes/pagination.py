@@ -0,0 +1,148 @@
+"""Постраничный вывод заметок по курсору (keyset pagination).
+
+В отличие от стандартного Paginator, не выполняет COUNT(*) и OFFSET:
+страница выбирается диапазоном по первичному ключу, поэтому стоимость
+запроса не зависит от того, насколько далеко пользователь пролистал список.
+"""
+import base64
+import binascii
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    """Курсор страницы повреждён или подделан."""
+
+
+def encode_cursor(direction, pk):
+    """Упаковывает направление и ключ в непрозрачную строку для URL."""
+    raw = f'{direction}{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает курсор, возвращает пару (направление, ключ)."""
+    padding = '=' * (-len(token) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(token + padding).decode()
+        direction, pk = raw[:1], int(raw[1:])
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(token)
+    if direction not in (NEXT, PREVIOUS) or pk < 0:
+        raise InvalidCursor(token)
+    return direction, pk
+
+
+class KeysetPage:
+    """Страница заметок, аналог django.core.paginator.Page."""
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self._items = []
+
+    def load(self):
+        # Вычисляем queryset сразу: шаблон возьмёт строки из кэша.
+        self._items = list(self.object_list)
+
+    async def aload(self):
+        self._items = [item async for item in self.object_list]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def has_next(self):
+        return self._has_next and bool(self._items)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return encode_cursor(NEXT, self._items[-1].pk)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous() or not self._items:
+            return None
+        return encode_cursor(PREVIOUS, self._items[0].pk)
+
+
+class KeysetPaginator:
+    """Делит queryset на страницы по возрастанию первичного ключа.
+
+    Каждая страница стоит двух запросов по индексу: первый находит
+    границу страницы (ключ первой строки за её пределами), второй читает
+    саму страницу диапазоном. Благодаря этому object_list остаётся обычным
+    queryset без среза, его можно дополнительно фильтровать.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    def _parse(self, cursor):
+        if cursor is None:
+            return NEXT, None
+        return decode_cursor(cursor)
+
+    def _range(self, direction, pk):
+        """Строки по нужную сторону от курсора и порядок их обхода."""
+        if direction == NEXT:
+            if pk is None:
+                return self.queryset, 'pk'
+            return self.queryset.filter(pk__gt=pk), 'pk'
+        return self.queryset.filter(pk__lt=pk), '-pk'
+
+    def _boundary_queryset(self, queryset, ordering):
+        keys = queryset.order_by(ordering).values_list('pk', flat=True)
+        return keys[self.per_page:self.per_page + 1]
+
+    def _make_page(self, direction, pk, queryset, boundary):
+        if direction == NEXT:
+            if boundary is not None:
+                queryset = queryset.filter(pk__lt=boundary)
+            return KeysetPage(
+                queryset.order_by('pk'),
+                has_next=boundary is not None,
+                has_previous=pk is not None,
+            )
+        if boundary is not None:
+            queryset = queryset.filter(pk__gt=boundary)
+        return KeysetPage(
+            queryset.order_by('pk'),
+            has_next=True,
+            has_previous=boundary is not None,
+        )
+
+    def page(self, cursor=None):
+        direction, pk = self._parse(cursor)
+        queryset, ordering = self._range(direction, pk)
+        boundary = list(self._boundary_queryset(queryset, ordering))
+        page = self._make_page(
+            direction, pk, queryset, boundary[0] if boundary else None
+        )
+        page.load()
+        return page
+
+    async def apage(self, cursor=None):
+        direction, pk = self._parse(cursor)
+        queryset, ordering = self._range(direction, pk)
+        boundary = [
+            key async for key in self._boundary_queryset(queryset, ordering)
+        ]
+        page = self._make_page(
+            direction, pk, queryset, boundary[0] if boundary else None
+        )
+        await page.aload()
+        return page
@@ -1,11 +1,25 @@
 # conftest.py
+import time
+from contextlib import contextmanager
+
 import pytest
 
 # Импортируем класс клиента.
+from django.core.cache import cache
+from django.db import connection
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
 
 # Импортируем модель заметки, чтобы создать экземпляр.
+from notes import search
 from notes.models import Note
+from tests.common_test import LARGE_NOTES_PER_USER, LARGE_USERS
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Кэш страниц не откатывается вместе с базой между тестами.
+    cache.clear()
 
 
 @pytest.fixture
@@ -60,4 +74,61 @@ def form_data():
         'title': 'Новый заголовок',
         'text': 'Новый текст',
         'slug': 'new-slug'
-    } 
\ No newline at end of file
+    }
+
+
+@pytest.fixture
+def budget():
+    """Проверяет, что блок укладывается в число запросов и время.
+
+    Пример: with budget(queries=4, ms=200): client.get(url)
+    """
+    @contextmanager
+    def check(queries, ms):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            yield captured
+            elapsed = (time.perf_counter() - started) * 1000
+        sql = '\n'.join(query['sql'] for query in captured)
+        assert len(captured) <= queries, (
+            f'{len(captured)} запросов при бюджете {queries}:\n{sql}'
+        )
+        assert elapsed <= ms, f'{elapsed:.0f} мс при бюджете {ms} мс'
+    return check
+
+
+@pytest.fixture
+def user_factory(django_user_model):
+    def create_users(count, prefix='Пользователь'):
+        return django_user_model.objects.bulk_create(
+            django_user_model(username=f'{prefix} {number}')
+            for number in range(count)
+        )
+    return create_users
+
+
+@pytest.fixture
+def notes_factory():
+    def create_notes(authors, count, text='Текст заметки'):
+        """По count заметок каждому из authors одним bulk_create."""
+        notes = Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {number}',
+                text=text,
+                slug=f'u{author.pk}-{number}',
+                author=author,
+            )
+            for author in authors
+            for number in range(count)
+        )
+        search.index_notes(notes)
+        return notes
+    return create_notes
+
+
+@pytest.fixture
+def large_dataset(author, note, user_factory, notes_factory):
+    """10 000 заметок у 100 пользователей, включая автора."""
+    notes_factory([author], LARGE_NOTES_PER_USER - 1)
+    notes_factory(user_factory(LARGE_USERS - 1), LARGE_NOTES_PER_USER)
+    return author
@@ -28,10 +28,13 @@
 
 
 import pytest
+from pytest_lazy_fixtures import lf
 
+from django.conf import settings
 from django.urls import reverse
 
 from notes.forms import NoteForm
+from tests.common_test import CONTENT_BUDGETS
 
 
 @pytest.mark.parametrize(
@@ -39,8 +42,8 @@ from notes.forms import NoteForm
     'parametrized_client, note_in_list',
     (
         # Передаём фикстуры в параметры при помощи "ленивых фикстур":
-        (pytest.lazy_fixture('author_client'), True),
-        (pytest.lazy_fixture('not_author_client'), False),
+        (lf('author_client'), True),
+        (lf('not_author_client'), False),
     )
 )
 def test_notes_list_for_different_users(
@@ -84,7 +87,7 @@ def test_notes_list_for_different_users(
         # никакие дополнительные аргументы для reverse() не нужны.
         ('notes:add', None),
         # Для тестирования страницы редактирования заметки нужен slug заметки.
-        ('notes:edit', pytest.lazy_fixture('slug_for_args'))
+        ('notes:edit', lf('slug_for_args'))
     )
 )
 def test_pages_contains_form(author_client, name, args):
@@ -95,4 +98,20 @@ def test_pages_contains_form(author_client, name, args):
     # Проверяем, есть ли объект формы в словаре контекста:
     assert 'form' in response.context
     # Проверяем, что объект формы относится к нужному классу.
-    assert isinstance(response.context['form'], NoteForm)
\ No newline at end of file
+    assert isinstance(response.context['form'], NoteForm)
+
+
+def test_content_budgets(
+        large_dataset, author_client, slug_for_args, budget, subtests
+):
+    for name, (queries, ms) in CONTENT_BUDGETS.items():
+        args = slug_for_args if name == 'notes:edit' else None
+        with subtests.test(name=name):
+            with budget(queries=queries, ms=ms):
+                response = author_client.get(reverse(name, args=args))
+            if name == 'notes:list':
+                assert len(response.context['object_list']) == (
+                    settings.NOTES_PER_PAGE
+                )
+            else:
+                assert isinstance(response.context['form'], NoteForm)
@@ -64,6 +64,15 @@ def test_not_unique_slug(author_client, note, form_data):
     assert Note.objects.count() == 1
 
 
+def test_other_author_can_use_same_slug(not_author_client, note, form_data):
+    url = reverse('notes:add')
+    # Slug уникален только в пределах одного автора:
+    form_data['slug'] = note.slug
+    response = not_author_client.post(url, data=form_data)
+    assertRedirects(response, reverse('notes:success'))
+    assert Note.objects.filter(slug=note.slug).count() == 2
+
+
 def test_empty_slug(author_client, form_data):
     url = reverse('notes:add')
     # Убираем поле slug из словаря:
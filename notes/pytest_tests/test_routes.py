@@ -2,9 +2,12 @@
 from http import HTTPStatus
 import pytest
 from pytest_django.asserts import assertRedirects
+from pytest_lazy_fixtures import lf
 
 from django.urls import reverse
 
+from tests.common_test import ANONYMOUS_BUDGETS, AUTH_USER_BUDGETS
+
 
 
 # test_routes.py
@@ -22,7 +25,7 @@ def test_pages_availability_for_anonymous_user(client, name):
 
 @pytest.mark.parametrize(
     'name',
-    ('notes:list', 'notes:add', 'notes:success')
+    ('notes:list', 'notes:add', 'notes:success', 'notes:search')
 )
 def test_pages_availability_for_auth_user(not_author_client, name):
     url = reverse(name)
@@ -33,10 +36,10 @@ def test_pages_availability_for_auth_user(not_author_client, name):
 @pytest.mark.parametrize(
     'parametrized_client, expected_status',
     # Предварительно оборачиваем имена фикстур 
-    # в вызов функции pytest.lazy_fixture().
+    # в вызов функции lf().
     (
-        (pytest.lazy_fixture('not_author_client'), HTTPStatus.NOT_FOUND),
-        (pytest.lazy_fixture('author_client'), HTTPStatus.OK)
+        (lf('not_author_client'), HTTPStatus.NOT_FOUND),
+        (lf('author_client'), HTTPStatus.OK)
     ),
 )
 @pytest.mark.parametrize(
@@ -54,12 +57,13 @@ def test_pages_availability_for_different_users(
 @pytest.mark.parametrize(
     'name, args',
     (
-        ('notes:detail', pytest.lazy_fixture('slug_for_args')),
-        ('notes:edit', pytest.lazy_fixture('slug_for_args')),
-        ('notes:delete', pytest.lazy_fixture('slug_for_args')),
+        ('notes:detail', lf('slug_for_args')),
+        ('notes:edit', lf('slug_for_args')),
+        ('notes:delete', lf('slug_for_args')),
         ('notes:add', None),
         ('notes:success', None),
         ('notes:list', None),
+        ('notes:search', None),
     ),
 )
 # Передаём в тест анонимный клиент, name проверяемых страниц и args:
@@ -69,4 +73,29 @@ def test_redirects(client, name, args):
     url = reverse(name, args=args)
     expected_url = f'{login_url}?next={url}'
     response = client.get(url)
-    assertRedirects(response, expected_url)
\ No newline at end of file
+    assertRedirects(response, expected_url)
+
+
+NOTE_ROUTES = ('notes:detail', 'notes:edit', 'notes:delete')
+
+
+# Данные создаются один раз на тест, страницы проверяются подтестами.
+def test_auth_user_route_budgets(
+        large_dataset, author_client, slug_for_args, budget, subtests
+):
+    for name, (queries, ms) in AUTH_USER_BUDGETS.items():
+        args = slug_for_args if name in NOTE_ROUTES else None
+        with subtests.test(name=name):
+            with budget(queries=queries, ms=ms):
+                response = author_client.get(
+                    reverse(name, args=args), {'q': 'заметка'}
+                )
+            assert response.status_code == HTTPStatus.OK
+
+
+def test_anonymous_route_budgets(large_dataset, client, budget, subtests):
+    for name, (queries, ms) in ANONYMOUS_BUDGETS.items():
+        with subtests.test(name=name):
+            with budget(queries=queries, ms=ms):
+                response = client.get(reverse(name))
+            assert response.status_code == HTTPStatus.OK
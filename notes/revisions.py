@@ -0,0 +1,135 @@
+"""История изменений заметок.
+
+Каждое сохранение заголовка или текста добавляет ревизию. Ревизия хранит
+сжатую построчную разницу с предыдущей версией текста, а каждые
+NOTES_REVISION_SNAPSHOT_EVERY ревизий — полный снимок, поэтому для
+восстановления любой версии нужно применить не больше стольких разниц.
+Снимок пишется и тогда, когда разница вышла не меньше снимка, и когда
+предыдущий текст неизвестен или не совпал с последней ревизией по
+контрольной сумме (например, после QuerySet.update).
+
+Номер ревизии — следующий за последним; если параллельное сохранение
+той же заметки заняло его раньше, ревизия собирается заново.
+"""
+import json
+import zlib
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .conflicts import is_unique_conflict
+
+# Сколько раз пробуем записать ревизию, если номер занят параллельно.
+REVISION_ATTEMPTS = 5
+# Ограничение (note, number) ревизий.
+NUMBER_CONSTRAINT = 'note_revision_number_uniq'
+
+
+def compress(text):
+    return zlib.compress(text.encode())
+
+
+def decompress(data):
+    return zlib.decompress(data).decode()
+
+
+def checksum(text):
+    return zlib.crc32(text.encode())
+
+
+def make_delta(old, new):
+    """Разница строк: диапазоны строк старого текста и новые куски."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = SequenceMatcher(None, old_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append((i1, i2))
+        elif j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+    return json.dumps(ops, ensure_ascii=False, separators=(',', ':'))
+
+
+def apply_delta(old, delta):
+    old_lines = old.splitlines(keepends=True)
+    return ''.join(
+        op if isinstance(op, str) else ''.join(old_lines[op[0]:op[1]])
+        for op in json.loads(delta)
+    )
+
+
+def last_revision(note):
+    from .models import NoteRevision
+
+    return NoteRevision.objects.filter(note=note).order_by(
+        '-number'
+    ).only('number', 'snapshot', 'checksum').first()
+
+
+def record(note, previous_text, created=False):
+    """Добавляет ревизию с текущими заголовком и текстом заметки.
+
+    previous_text — текст до сохранения или None, если он неизвестен.
+    """
+    for attempt in range(1, REVISION_ATTEMPTS + 1):
+        revision = build_revision(
+            note, previous_text, None if created else last_revision(note)
+        )
+        try:
+            # Точка сохранения, см. notes.conflicts.
+            with transaction.atomic():
+                revision.save()
+            return revision
+        except IntegrityError as error:
+            if (
+                not is_unique_conflict(error, NUMBER_CONSTRAINT)
+                or attempt == REVISION_ATTEMPTS
+            ):
+                raise
+
+
+def build_revision(note, previous_text, last):
+    """Ревизия, следующая за last: разница с ним или полный снимок."""
+    from .models import NoteRevision
+
+    revision = NoteRevision(
+        note=note,
+        number=last.number + 1 if last else 1,
+        title=note.title,
+        checksum=checksum(note.text),
+    )
+    snapshot = compress(note.text)
+    if (
+        last is not None
+        and previous_text is not None
+        and last.checksum == checksum(previous_text)
+        and revision.number - last.snapshot
+        < settings.NOTES_REVISION_SNAPSHOT_EVERY
+    ):
+        delta = compress(make_delta(previous_text, note.text))
+        if len(delta) < len(snapshot):
+            revision.snapshot = last.snapshot
+            revision.data = delta
+    if not revision.snapshot:
+        revision.snapshot = revision.number
+        revision.data = snapshot
+    return revision
+
+
+def reconstruct(note, number):
+    """Заголовок и текст заметки в ревизии number или None."""
+    revisions = note.revisions.all()
+    target = revisions.filter(number=number).values_list(
+        'snapshot', flat=True
+    ).first()
+    if target is None:
+        return None
+    text = None
+    for revision in revisions.filter(
+        number__range=(target, number)
+    ).order_by('number'):
+        data = decompress(revision.data)
+        text = data if revision.is_snapshot else apply_delta(text, data)
+    return revision.title, text
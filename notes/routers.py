@@ -0,0 +1,131 @@
+"""Чтение заметок с реплик базы, запись — в основную базу.
+
+Реплики перечислены в NOTES_DB_REPLICAS (алиасы DATABASES, см.
+yanote/settings.py). На реплики идёт только чтение моделей приложения
+notes и только внутри запроса, который пропустил
+ReplicaRoutingMiddleware; сессии, пользователи, команды и миграции
+работают с основной базой.
+
+Реплика отстаёт от основной базы, поэтому чтение возвращается на
+основную базу:
+
+- в запросах POST, PUT, PATCH и DELETE и после любой записи в запросе;
+- на NOTES_DB_PIN_SECONDS после изменения заметок пользователя (см.
+  pin_to_primary и notes.signals.invalidate_pages) — пользователь сразу
+  видит свои правки, а кэш страниц не заполняется устаревшими данными.
+  Окно должно быть больше отставания реплик.
+
+Реплика выбирается одна на запрос, чтобы все его запросы видели один и
+тот же срез данных.
+
+Метка «читать с основной базы» хранится в кэше NOTES_CACHE_ALIAS, и его
+должны делить все процессы: иначе запись в одном процессе не переведёт
+чтение в другом, пользователь не увидит своих правок, а другой процесс
+закэширует страницу по отстающей реплике. Кэш в памяти процесса с
+репликами не проходит проверку notes.E001 (см. check_shared_cache).
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.db import DEFAULT_DB_ALIAS
+
+from . import caching
+
+PIN_KEY = 'notes:primary:{user_id}'
+# Кэши, которые не видны другим процессам.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+_state = ContextVar('notes_db_routing', default=None)
+
+
+class RoutingState:
+    """Куда читать в текущем запросе."""
+    __slots__ = ('replica', 'primary')
+
+    def __init__(self, replica, primary):
+        self.replica = replica
+        self.primary = primary
+
+
+@contextmanager
+def route_request(primary):
+    """Разрешает чтение с реплики до конца блока, если не primary."""
+    token = _state.set(
+        RoutingState(random.choice(settings.NOTES_DB_REPLICAS), primary)
+    )
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def pin_to_primary(user_id):
+    """Читать заметки пользователя с основной базы NOTES_DB_PIN_SECONDS."""
+    if settings.NOTES_DB_REPLICAS:
+        caching.get_cache().set(
+            PIN_KEY.format(user_id=user_id), True,
+            settings.NOTES_DB_PIN_SECONDS,
+        )
+
+
+def is_pinned(user_id):
+    return caching.get_cache().get(PIN_KEY.format(user_id=user_id), False)
+
+
+async def ais_pinned(user_id):
+    return await caching.get_cache().aget(
+        PIN_KEY.format(user_id=user_id), False
+    )
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs=None, **kwargs):
+    """Реплики работают только с кэшем, общим для процессов."""
+    if not settings.NOTES_DB_REPLICAS:
+        return []
+    backend = settings.CACHES[settings.NOTES_CACHE_ALIAS]['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [checks.Error(
+        f'Кэш {settings.NOTES_CACHE_ALIAS!r} ({backend}) не общий для '
+        f'процессов, а реплики заданы.',
+        hint='Задайте общий кэш, например YANOTE_FILE_CACHE_DIR, или '
+             'уберите YANOTE_DB_REPLICAS.',
+        id='notes.E001',
+    )]
+
+
+class ReplicaRouter:
+    """Роутер DATABASE_ROUTERS: чтение заметок с реплики запроса."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is None or state.primary
+            or model._meta.app_label != 'notes'
+        ):
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.primary = True
+        # Явно, иначе Django пишет объект туда, откуда его прочитал.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными основной базы.
+        if db in settings.NOTES_DB_REPLICAS:
+            return False
+        return None
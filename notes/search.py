@@ -0,0 +1,163 @@
+"""Полнотекстовый поиск по заметкам автора.
+
+На SQLite используется виртуальная таблица FTS5 notes_note_fts: rowid
+совпадает с id заметки, колонка owner хранит метку автора вида «a42»,
+колонка slug — адрес заметки для поиска в админке.
+Фильтр по автору входит в само выражение MATCH, поэтому обе части
+запроса обслуживает инвертированный индекс, а не перебор заметок.
+Таблица синхронизируется сигналами (см. notes.signals), а не триггерами:
+так в индекс попадает текст в том виде, в каком его видит приложение.
+
+На других СУБД поиск сводится к icontains по заголовку и тексту. Сжатые
+тексты (от NOTES_TEXT_COMPRESS_OVER байт, см. notes.fields) лежат в
+text_zlib, а text у них пуст, поэтому такие заметки находятся там только
+по заголовку.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'notes_note_fts'
+TERM_RE = re.compile(r'\w+')
+# Заголовок весит больше текста, метка автора и адрес в ранжировании
+# не участвуют.
+RANK = f'bm25({FTS_TABLE}, 0.0, 10.0, 1.0, 0.0)'
+SNIPPET_WORDS = 12
+# Управляющие символы вместо тегов: текст сниппета нужно экранировать,
+# а разметку подсветки добавить уже после этого.
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def is_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def owner_label(author_id):
+    return f'a{author_id}'
+
+
+def build_phrases(query):
+    """Все слова запроса как префиксы или None, если слов нет."""
+    terms = TERM_RE.findall(query.lower())
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def build_match(author_id, query):
+    """Выражение MATCH: слова запроса в заголовке или тексте автора."""
+    phrases = build_phrases(query)
+    if phrases is None:
+        return None
+    return f'owner:{owner_label(author_id)} AND {{title text}}:({phrases})'
+
+
+def index_notes(notes, created=False):
+    """Добавляет или обновляет заметки в поисковом индексе.
+
+    created — заметки только что созданы и старых записей в индексе нет.
+    """
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        if not created:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(note.pk,) for note in notes],
+            )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, owner, title, text, slug) '
+            f'VALUES (%s, %s, %s, %s, %s)',
+            [
+                (note.pk, owner_label(note.author_id), note.title, note.text,
+                 note.slug)
+                for note in notes
+            ],
+        )
+
+
+def unindex_notes(pks):
+    """Удаляет заметки из поискового индекса."""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(pk,) for pk in pks],
+        )
+
+
+def highlight(snippet):
+    """Экранирует сниппет и подсвечивает найденные слова."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def search(queryset, author_id, query, limit, offset=0):
+    """Заметки автора, найденные по запросу, в порядке релевантности.
+
+    Возвращает список заметок без текста с атрибутом snippet.
+    """
+    if not is_enabled():
+        return _search_icontains(queryset, query, limit, offset)
+    match = build_match(author_id, query)
+    if match is None:
+        return []
+    notes = queryset.model.objects.raw(
+        f'SELECT note.id, note.title, note.slug, '
+        f'snippet({FTS_TABLE}, -1, %s, %s, %s, %s) AS snippet '
+        f'FROM {FTS_TABLE} '
+        f'JOIN {queryset.model._meta.db_table} note '
+        f'ON note.id = {FTS_TABLE}.rowid '
+        f'WHERE {FTS_TABLE} MATCH %s AND note.deleted IS NULL '
+        f'ORDER BY {RANK} LIMIT %s OFFSET %s',
+        [MARK_START, MARK_END, '…', SNIPPET_WORDS, match, limit, offset],
+    )
+    notes = list(notes)
+    for note in notes:
+        note.snippet = highlight(note.snippet)
+    return notes
+
+
+def filter_by_title(queryset, query):
+    """Заметки всех авторов со словами запроса в заголовке или адресе.
+
+    Удалённых заметок в индексе нет, поэтому они не находятся.
+    """
+    if not is_enabled():
+        for term in TERM_RE.findall(query):
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(slug__icontains=term)
+            )
+        return queryset
+    phrases = build_phrases(query)
+    if phrases is None:
+        return queryset
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [f'{{title slug}}:({phrases})'],
+    ))
+
+
+def _search_icontains(queryset, query, limit, offset):
+    terms = TERM_RE.findall(query)
+    if not terms:
+        return []
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(body__text__icontains=term)
+        )
+    notes = list(
+        queryset.order_by('-pk').only('id', 'title', 'slug')
+        [offset:offset + limit]
+    )
+    for note in notes:
+        note.snippet = ''
+    return notes
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import auth, caching, metrics, revisions, routers, search
+from .models import Note
+
+# Поля, от которых зависит поисковый индекс. Правка текста приходит
+# в update_fields как updated (см. Note.save).
+SEARCH_FIELDS = {'title', 'slug', 'updated', 'deleted'}
+# Поля, которые хранит история заметки.
+REVISION_FIELDS = {'title', 'updated'}
+
+
+def invalidate_pages(user_id):
+    """Сбрасывает кэш страниц пользователя сейчас и после коммита.
+
+    Повторный сброс после коммита нужен, чтобы параллельный запрос не
+    успел закэшировать под новой версией ещё не закоммиченные данные.
+    Так же дважды чтение пользователя переводится на основную базу:
+    реплики получат изменение не сразу.
+    """
+    def invalidate():
+        routers.pin_to_primary(user_id)
+        caching.bump_version(user_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Note)
+def index_saved_note(sender, instance, created, update_fields=None,
+                     **kwargs):
+    """Обновляет поисковый индекс после сохранения заметки."""
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    if instance.deleted is not None:
+        search.unindex_notes([instance.pk])
+    else:
+        search.index_notes([instance], created=created)
+
+
+@receiver(post_save, sender=Note)
+def record_note_revision(sender, instance, created, update_fields=None,
+                         raw=False, **kwargs):
+    """Добавляет ревизию, если изменились заголовок или текст."""
+    if raw or (
+        update_fields is not None and not REVISION_FIELDS & set(update_fields)
+    ):
+        return
+    previous_text = None if created else instance.get_loaded('text')
+    if not created and previous_text == instance.text and (
+        instance.get_loaded('title') == instance.title
+    ):
+        return
+    revisions.record(instance, previous_text, created)
+
+
+@receiver(post_delete, sender=Note)
+def unindex_deleted_note(sender, instance, **kwargs):
+    """Убирает удалённую заметку из поискового индекса."""
+    search.unindex_notes([instance.pk])
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_note_pages(sender, instance, **kwargs):
+    invalidate_pages(instance.author_id)
+
+
+@receiver(m2m_changed, sender=Note.tags.through)
+def invalidate_tagged_note_pages(sender, instance, action, **kwargs):
+    """Теги выводятся в списке заметок."""
+    if action.startswith('post_'):
+        invalidate_pages(instance.author_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_pages(sender, instance, update_fields=None, **kwargs):
+    """Имя пользователя выводится в шапке закэшированных страниц."""
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    invalidate_pages(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_saved_user(sender, instance, **kwargs):
+    """Пароль, активность и права действуют сразу в процессах этого кэша.
+
+    С кэшем в памяти процесса остальные процессы узнают о них только по
+    истечении кэша (см. notes.auth).
+    """
+    auth.forget_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, user, **kwargs):
+    if user is not None:
+        auth.forget_user(user.pk)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """Запросы каждого соединения считаются в метриках ответа."""
+    metrics.install(connection)
@@ -0,0 +1,95 @@
+"""Подбор уникального slug для заметки.
+
+Уникальность не проверяется заранее запросом: заметка сразу записывается
+в базу, а при конфликте уникального ограничения (author, slug) запись
+повторяется с новым суффиксом. Проверка и вставка выполняются базой
+атомарно, поэтому конкурирующие запросы не могут занять один slug.
+
+Транслитерация заголовка запоминается в ограниченном LRU-кэше: при
+массовом импорте одни и те же заголовки повторяются тысячи раз.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.crypto import get_random_string
+from pytils.translit import slugify
+
+from . import translit
+from .conflicts import is_unique_conflict
+
+# Сколько раз пробуем записать заметку со случайным суффиксом.
+SLUG_ATTEMPTS = 5
+SUFFIX_LENGTH = 6
+SUFFIX_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+# Используется, если в заголовке нет ни одного транслитерируемого символа.
+DEFAULT_SLUG = 'note'
+# Ограничение (author, slug) заметок.
+SLUG_CONSTRAINT = 'note_author_slug_uniq'
+
+
+@lru_cache(maxsize=settings.NOTES_SLUG_CACHE_SIZE)
+def transliterate(title):
+    """Транслитерация заголовка с кэшированием результата."""
+    if settings.NOTES_FAST_SLUGIFY:
+        return translit.slugify(title)
+    return slugify(title)
+
+
+def slug_cache_info():
+    """Статистика кэша транслитерации: hits, misses, maxsize, currsize."""
+    return transliterate.cache_info()
+
+
+def slugify_title(title, max_length):
+    """Базовый slug из заголовка заметки."""
+    return transliterate(title)[:max_length] or DEFAULT_SLUG
+
+
+def add_suffix(base, max_length):
+    """Добавляет к slug случайный суффикс, не выходя за max_length."""
+    suffix = '-' + get_random_string(SUFFIX_LENGTH, SUFFIX_CHARS)
+    return base[:max_length - len(suffix)] + suffix
+
+
+def is_slug_conflict(error):
+    """Вызвана ли ошибка IntegrityError повтором slug у автора."""
+    return is_unique_conflict(error, SLUG_CONSTRAINT)
+
+
+def allocate_bulk_slugs(notes, max_attempts=SLUG_ATTEMPTS):
+    """Заполняет slug у пачки заметок перед bulk_create.
+
+    bulk_create не вызывает Note.save, поэтому пустой slug получает тот же
+    базовый вариант из заголовка, а занятые у автора варианты (в базе или
+    в самой пачке) получают случайный суффикс. На пачку уходит один запрос
+    к индексу (author, slug) плюс по одному на редкие повторные конфликты.
+    """
+    if not notes:
+        return
+    model = type(notes[0])
+    max_length = model._meta.get_field('slug').max_length
+    for note in notes:
+        if not note.slug:
+            note.slug = slugify_title(note.title, max_length)
+    accepted = set()
+    # Суффикс добавляется к базовому slug, а не к уже суффиксированному.
+    pending = [(note, note.slug) for note in notes]
+    for _ in range(max_attempts):
+        taken = set(
+            model.objects.filter(
+                author_id__in={note.author_id for note, _ in pending},
+                slug__in={note.slug for note, _ in pending},
+            ).values_list('author_id', 'slug')
+        )
+        conflicts = []
+        for note, base in pending:
+            key = (note.author_id, note.slug)
+            if key in taken or key in accepted:
+                conflicts.append((note, base))
+            else:
+                accepted.add(key)
+        if not conflicts:
+            return
+        for note, base in conflicts:
+            note.slug = add_suffix(base, max_length)
+        pending = conflicts
@@ -0,0 +1,53 @@
+"""Быстрая транслитерация для slug, совместимая с pytils.
+
+pytils.translit.slugify фильтрует строку посимвольно в Python и затем
+проходит по ней str.replace для каждой из ~100 пар таблицы TRANSTABLE.
+Здесь фильтрация и замена сделаны одним вызовом str.translate по таблице,
+построенной из той же TRANSTABLE, поэтому результат совпадает с pytils
+байт в байт.
+"""
+import re
+
+from pytils.translit import ALPHABET, TRANSTABLE
+
+AMPERSAND_RE = re.compile(r'\&amp\;|\&')
+SPACES_RE = re.compile(r'[-\s]+')
+NOT_SLUG_RE = re.compile(r'[^\w\s-]')
+
+
+class TranslitTable(dict):
+    """Таблица для str.translate: символы вне алфавита pytils удаляются.
+
+    Перечислить заранее все такие символы Unicode нельзя, поэтому они
+    добавляются в таблицу при первой встрече, но не больше MAX_SIZE.
+    """
+    MAX_SIZE = 4096
+
+    def __missing__(self, code):
+        if len(self) < self.MAX_SIZE:
+            self[code] = None
+        return None
+
+
+def build_table():
+    table = TranslitTable()
+    # Как и в pytils, из повторяющихся пар применяется первая.
+    for source, target in TRANSTABLE:
+        table.setdefault(ord(source), target)
+    # Латиница, цифры и знаки, которые pytils сохраняет без замены.
+    for symbol in ALPHABET:
+        if len(symbol) == 1:
+            table.setdefault(ord(symbol), symbol)
+    return table
+
+
+TABLE = build_table()
+
+
+def slugify(in_string):
+    """Тот же результат, что у pytils.translit.slugify."""
+    result = str(in_string).lower()
+    result = AMPERSAND_RE.sub(' and ', result)
+    result = SPACES_RE.sub('-', result)
+    result = result.translate(TABLE)
+    return NOT_SLUG_RE.sub('', result).strip().lower()
@@ -9,7 +9,17 @@ urlpatterns = [
     path('add/', views.NoteCreate.as_view(), name='add'),
     path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
+    path(
+        'note/<slug:slug>/history/', views.NoteRevisions.as_view(),
+        name='revisions'
+    ),
+    path(
+        'note/<slug:slug>/history/<int:number>/',
+        views.NoteRevisionDetail.as_view(), name='revision'
+    ),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('metrics/', views.metrics_report, name='metrics'),
 ]
@@ -1,18 +1,104 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import render
+from django.db import IntegrityError, transaction
+from django.http import (
+    Http404, HttpResponse, HttpResponseRedirect, JsonResponse
+)
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
 from django.views import generic
 
+from . import caching, metrics, revisions, search
 from .forms import NoteForm
-from .models import Note
+from .models import Folder, Note, NoteTag
+from .pagination import InvalidCursor, KeysetPaginator
+from .slugs import is_slug_conflict
 
 
+def save_note_form(form):
+    """Сохраняет заметку из формы; True, если запись удалась.
 
-class Home(generic.TemplateView):
-    """Домашняя страница."""
-    template_name = 'notes/home.html'
+    Занятый slug выясняется при записи, а не отдельным запросом:
+    при конфликте в форму добавляется ошибка. Неизменённую заметку
+    форма не сохраняет вовсе.
+    """
+    if not form.instance._state.adding and not form.has_changed():
+        return True
+    try:
+        with transaction.atomic():
+            form.save()
+    except IntegrityError as error:
+        if not is_slug_conflict(error):
+            raise
+        form.add_slug_error()
+        return False
+    return True
+
+
+def note_validators(queryset, slug):
+    """Запрос ключа и времени изменения заметки по индексу (author, slug)."""
+    return queryset.filter(slug=slug).values_list('pk', 'updated')
+
+
+def note_etag(user_id, version, pk, updated):
+    """Значение ETag заметки; version — версия страниц пользователя.
+
+    Версия меняется и без правки заметки, например со сменой имени
+    пользователя в шапке страницы. Без версии ETag не ставится, как и у
+    списка (см. caching.page_etag).
+    """
+    if version is None:
+        return None
+    return f'note-{user_id}-{version}-{pk}-{updated.timestamp()}'
+
+
+def filter_notes(queryset, params):
+    """Заметки папки ?folder= и тега ?tag=; пара (queryset, фильтры).
+
+    Тег фильтруется подзапросом, а не JOIN: id заметок тега идут по
+    индексу note_tag_uniq, и каждая заметка находится по (author, id),
+    вместо перебора всех заметок автора.
+    """
+    filters = {}
+    for name in ('folder', 'tag'):
+        value = params.get(name)
+        if value is None:
+            continue
+        try:
+            filters[name] = int(value)
+        except ValueError:
+            raise Http404('Некорректный фильтр списка.')
+        # Большее число SQLite не принимает и падает с OverflowError.
+        if not -2 ** 63 <= filters[name] < 2 ** 63:
+            raise Http404('Некорректный фильтр списка.')
+    if 'folder' in filters:
+        queryset = queryset.filter(folder=filters['folder'])
+    if 'tag' in filters:
+        queryset = queryset.filter(pk__in=NoteTag.objects.filter(
+            tag=filters['tag']
+        ).values('note'))
+    return queryset, filters
+
+
+def list_context(filters, folders):
+    """Папки для навигации и фильтры для ссылок на соседние страницы."""
+    return {
+        'folders': folders,
+        'filters': filters,
+        'filter_query': urlencode(filters) + '&' if filters else '',
+    }
+
+
+def recent_notes(queryset):
+    """Последние изменённые заметки по индексу note_author_recent_idx."""
+    return queryset.order_by('-updated').only(
+        'title', 'slug', 'updated'
+    )[:settings.NOTES_COUNT_ON_HOME_PAGE]
 
 
 class NoteSuccess(LoginRequiredMixin, generic.TemplateView):
@@ -30,39 +116,257 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class CachedPageMixin:
+    """Отдаёт страницу из кэша, пока заметки пользователя не менялись."""
+    cache_name = None
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = caching.page_key(request, self.cache_name)
+        content = caching.get_page(key)
+        if content is not None:
+            return HttpResponse(content)
+        return caching.store_on_render(
+            super().get(request, *args, **kwargs), key
+        )
+
+
+class Home(CachedPageMixin, generic.TemplateView):
+    """Домашняя страница; вошедшему пользователю — последние заметки.
+
+    Страница кэшируется до изменения заметок пользователя, а без кэша
+    заметки читаются одним запросом по индексу.
+    """
+    cache_name = 'home'
+    template_name = 'notes/home.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.request.user.is_authenticated:
+            context['recent_notes'] = recent_notes(
+                Note.objects.filter(author=self.request.user)
+            )
+        return context
+
+
+class ConditionalPageMixin:
+    """Отвечает 304 Not Modified, не выполняя запросов страницы.
+
+    Валидаторы вычисляются до отрисовки шаблона и до кэша страниц.
+    """
+
+    def get_validators(self):
+        """Пара (etag, last_modified); любое из значений может быть None."""
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = caching.prepare_validators(
+            *self.get_validators()
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return caching.set_validators(response, etag, last_modified)
+
+
+class NoteFormMixin(NoteBase):
+    """Общее для создания и редактирования заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
-        return super().form_valid(form)
+        if not save_note_form(form):
+            return self.form_invalid(form)
+        self.object = form.instance
+        return HttpResponseRedirect(self.get_success_url())
+
 
+class NoteCreate(NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+
+    def get_form_kwargs(self):
+        """Заметка сразу создаётся от имени текущего пользователя."""
+        kwargs = super().get_form_kwargs()
+        kwargs['instance'] = self.model(author=self.request.user)
+        return kwargs
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+
+class NoteUpdate(NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'body', 'folder'
+        ).prefetch_related('tags')
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
     """Удаление заметки."""
     template_name = 'notes/delete.html'
 
+    def form_valid(self, form):
+        """Заметка только помечается удалённой, строку удалит purge_notes."""
+        self.object.soft_delete()
+        return HttpResponseRedirect(self.get_success_url())
+
 
-class NotesList(NoteBase, generic.ListView):
+class NotesList(NoteBase, ConditionalPageMixin, CachedPageMixin,
+                generic.ListView):
     """Список всех заметок пользователя."""
+    cache_name = 'list'
     template_name = 'notes/list.html'
     context_object_name = 'notes'  # Явно задаем имя переменной контекста
+    paginate_by = settings.NOTES_PER_PAGE
+    page_kwarg = 'cursor'
+
+    def get_queryset(self):
+        """Для списка не нужен текст заметки, загружаем только ссылки.
+
+        Теги всех заметок страницы читаются одним запросом.
+        """
+        queryset, self.filters = filter_notes(
+            super().get_queryset(), self.request.GET
+        )
+        return queryset.only('id', 'title', 'slug').prefetch_related('tags')
 
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(**list_context(
+            self.filters, Folder.objects.filter(author=self.request.user)
+        ), **kwargs)
 
-class NoteDetail(NoteBase, generic.DetailView):
+    def get_validators(self):
+        """Ключ кэша содержит версию заметок пользователя и адрес."""
+        return caching.page_etag(
+            self.request, self.cache_name,
+            caching.get_version(self.request.user.pk),
+        ), None
+
+    def paginate_queryset(self, queryset, page_size):
+        """Листаем по курсору вместо номера страницы."""
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.page_kwarg))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class NoteSearch(NoteBase, generic.TemplateView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+    paginate_by = settings.NOTES_PER_PAGE
+
+    def get_page_number(self):
+        try:
+            number = int(self.request.GET.get('page', 1))
+        except ValueError:
+            raise Http404('Некорректный номер страницы.')
+        if number < 1:
+            raise Http404('Некорректный номер страницы.')
+        return number
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        number = self.get_page_number()
+        # Берём на одну заметку больше, чтобы узнать о следующей странице.
+        notes = search.search(
+            self.get_queryset(),
+            self.request.user.pk,
+            query,
+            limit=self.paginate_by + 1,
+            offset=(number - 1) * self.paginate_by,
+        ) if query else []
+        context.update(
+            query=query,
+            notes=notes[:self.paginate_by],
+            page_number=number,
+            has_next=len(notes) > self.paginate_by,
+        )
+        return context
+
+
+class NoteDetail(NoteBase, ConditionalPageMixin, CachedPageMixin,
+                 generic.DetailView):
     """Заметка подробно."""
+    cache_name = 'detail'
     template_name = 'notes/detail.html'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('body')
+
+    def get_validators(self):
+        """Один запрос по индексу (author, slug) вместо всей заметки."""
+        validators = note_validators(
+            self.get_queryset(), self.kwargs[self.slug_url_kwarg]
+        ).first()
+        if validators is None:
+            raise Http404('Заметка не найдена.')
+        pk, updated = validators
+        user_id = self.request.user.pk
+        return note_etag(
+            user_id, caching.get_version(user_id), pk, updated
+        ), updated
+
+
+class NoteRevisions(NoteBase, generic.ListView):
+    """История изменений заметки."""
+    template_name = 'notes/revisions.html'
+    context_object_name = 'revisions'
+    paginate_by = settings.NOTES_PER_PAGE
+
+    def get_queryset(self):
+        self.note = get_object_or_404(
+            super().get_queryset().only('id', 'title', 'slug'),
+            slug=self.kwargs['slug'],
+        )
+        return self.note.revisions.defer('data').order_by('-number')
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(note=self.note, **kwargs)
+
+
+class NoteRevisionDetail(NoteBase, generic.TemplateView):
+    """Версия заметки; POST восстанавливает её как новую ревизию."""
+    template_name = 'notes/revision.html'
+
+    def get_revision(self, note):
+        revision = revisions.reconstruct(note, self.kwargs['number'])
+        if revision is None:
+            raise Http404('Ревизия не найдена.')
+        return revision
+
+    def get_context_data(self, **kwargs):
+        note = get_object_or_404(
+            super().get_queryset().only('id', 'title', 'slug'),
+            slug=self.kwargs['slug'],
+        )
+        title, text = self.get_revision(note)
+        return super().get_context_data(
+            note=note, title=title, text=text, **kwargs
+        )
+
+    def post(self, request, *args, **kwargs):
+        note = get_object_or_404(
+            self.get_queryset().select_related('body'), slug=kwargs['slug']
+        )
+        note.title, note.text = self.get_revision(note)
+        with transaction.atomic():
+            note.save()
+        return redirect('notes:detail', slug=note.slug)
+
+
 def user_logout(request):
     logout(request)
-    return render(request, 'registration/logged_out.html')
\ No newline at end of file
+    return render(request, 'registration/logged_out.html')
+
+
+@staff_member_required
+def metrics_report(request):
+    """Метрики страниц этого процесса, только для персонала."""
+    return JsonResponse(
+        metrics.snapshot(), json_dumps_params={'ensure_ascii': False}
+    )
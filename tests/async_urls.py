@@ -0,0 +1,9 @@
+"""Адреса проекта с асинхронными представлениями заметок."""
+from django.urls import include, path
+
+from yanote.urls import auth_urls
+
+urlpatterns = [
+    path('', include('notes.async_urls')),
+    path('auth/', include(auth_urls)),
+]
@@ -1,9 +1,86 @@
 # tests/common_test.py
+import time
+from contextlib import contextmanager
+
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from notes import search
 from notes.models import Note
 
+# Размер «боевого» набора данных для проверки бюджетов.
+LARGE_USERS = 100
+LARGE_NOTES_PER_USER = 100
+
+# Бюджеты страниц на этом наборе, общие для unittest и pytest: имя ->
+# (число SQL-запросов, из них не больше одного на сессию и пользователя,
+# время ответа в миллисекундах).
+AUTH_USER_BUDGETS = {
+    # Последние заметки — один запрос по индексу.
+    'notes:home': (2, 100),
+    # Страница, её граница, теги заметок страницы и папки.
+    'notes:list': (5, 150),
+    'notes:add': (1, 100),
+    'notes:success': (1, 100),
+    'notes:search': (2, 150),
+    'notes:detail': (3, 100),
+    'notes:edit': (2, 100),
+    'notes:delete': (2, 100),
+}
+ANONYMOUS_BUDGETS = {
+    'notes:home': (0, 100),
+    'users:login': (0, 100),
+    'users:logout': (0, 100),
+    'users:signup': (0, 100),
+}
+# Страницы списка и форм.
+CONTENT_BUDGETS = {
+    name: AUTH_USER_BUDGETS[name]
+    for name in ('notes:list', 'notes:add', 'notes:edit')
+}
+
+
+def create_large_dataset(author):
+    """10 000 заметок у 100 пользователей, включая автора."""
+    User = get_user_model()
+    users = User.objects.bulk_create(
+        User(username=f'Пользователь {number}')
+        for number in range(LARGE_USERS - 1)
+    )
+    notes = Note.objects.bulk_create(
+        Note(
+            title=f'Заметка {number}',
+            text='Текст заметки',
+            slug=f'u{user.pk}-{number}',
+            author=user,
+        )
+        for user in (author, *users)
+        for number in range(LARGE_NOTES_PER_USER)
+    )
+    search.index_notes(notes)
+
+
+class QueryBudgetMixin:
+    """Проверка числа SQL-запросов и времени ответа страницы."""
+
+    @contextmanager
+    def assertBudget(self, queries, ms):  # noqa: N802
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            yield captured
+            elapsed = (time.perf_counter() - started) * 1000
+        sql = '\n'.join(query['sql'] for query in captured)
+        self.assertLessEqual(
+            len(captured), queries,
+            f'{len(captured)} запросов при бюджете {queries}:\n{sql}'
+        )
+        self.assertLessEqual(
+            elapsed, ms, f'{elapsed:.0f} мс при бюджете {ms} мс'
+        )
+
 
 class BaseTestContent(TestCase):
     NOTE_LIST_URL = reverse('notes:list')
@@ -27,8 +104,13 @@ class BaseTestContent(TestCase):
         }
 
     def setUp(self):
+        # Кэш страниц не откатывается вместе с транзакцией теста.
+        cache.clear()
         self.client.force_login(self.author)
     
+    def get_add_url(self):
+        return self.ADD_URL
+
     def get_edit_url(self, slug):
         return reverse('notes:edit', args=(slug,))
     
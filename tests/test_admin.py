@@ -0,0 +1,137 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes import search
+from notes.models import Note
+
+User = get_user_model()
+
+CHANGELIST_URL = reverse('admin:notes_note_changelist')
+
+
+class NoteAdminTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', password='admin')
+        cls.authors = [
+            User.objects.create(username=f'Автор {number}')
+            for number in range(3)
+        ]
+        for number in range(6):
+            Note.objects.create(
+                title=f'Заметка {number}', text='Текст',
+                slug=f'note-{number}', author=cls.authors[number % 3],
+            )
+        Note.objects.create(
+            title='Список покупок', text='Хлеб', slug='shopping',
+            author=cls.authors[0],
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def get_changelist(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(CHANGELIST_URL, params)
+        return response, [query['sql'] for query in queries]
+
+    def action(self, name, notes):
+        return self.client.post(CHANGELIST_URL, {
+            'action': name,
+            '_selected_action': [note.pk for note in notes],
+        })
+
+    def test_changelist_has_no_full_count_and_no_n_plus_one(self):
+        response, queries = self.get_changelist()
+        self.assertContains(response, 'Список покупок')
+        self.assertContains(response, 'Автор 2')
+        counts = [sql for sql in queries if 'COUNT(' in sql]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT', counts[0])
+        note_queries = [sql for sql in queries if '"notes_note"' in sql]
+        Note.objects.create(
+            title='Ещё', text='Текст',
+            author=User.objects.create(username='Новый автор'),
+        )
+        response, queries = self.get_changelist()
+        self.assertEqual(
+            len([sql for sql in queries if '"notes_note"' in sql]),
+            len(note_queries),
+        )
+        self.assertFalse(any('notes_notebody' in sql for sql in queries))
+
+    @override_settings(NOTES_ADMIN_COUNT_LIMIT=3)
+    def test_count_is_limited(self):
+        response, _ = self.get_changelist()
+        self.assertEqual(response.context['cl'].result_count, 3)
+
+    def test_search_by_title_and_slug(self):
+        for query, titles in (
+            ('покуп', ['Список покупок']),
+            ('shop', ['Список покупок']),
+            ('note 4', ['Заметка 4']),
+        ):
+            with self.subTest(query=query):
+                response, queries = self.get_changelist(q=query)
+                notes = response.context['cl'].result_list
+                self.assertEqual([note.title for note in notes], titles)
+                self.assertTrue(
+                    any(search.FTS_TABLE in sql for sql in queries)
+                )
+
+    def test_add_form_does_not_list_users(self):
+        response = self.client.get(reverse('admin:notes_note_add'))
+        self.assertNotContains(response, 'Автор 1')
+
+    def test_change_form_saves_tags(self):
+        note = Note.objects.get(slug='shopping')
+        url = reverse('admin:notes_note_change', args=(note.pk,))
+        self.client.post(url, {
+            'title': note.title, 'text': note.text, 'slug': note.slug,
+            'folder_name': 'Дом', 'tag_names': 'покупки, хлеб',
+            'author': note.author_id,
+        })
+        note = Note.objects.get(pk=note.pk)
+        self.assertEqual(note.folder.name, 'Дом')
+        self.assertEqual(note.get_tag_names(), 'покупки, хлеб')
+
+    @override_settings(NOTES_ADMIN_BATCH_SIZE=2)
+    def test_soft_delete_and_restore_in_batches(self):
+        notes = list(Note.objects.filter(slug__startswith='note-'))
+        with CaptureQueriesContext(connection) as queries:
+            self.action('soft_delete_notes', notes)
+        updates = [
+            sql for sql in (query['sql'] for query in queries)
+            if sql.startswith('UPDATE "notes_note"')
+        ]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(Note.objects.count(), 1)
+        self.assertEqual(Note.all_objects.count(), 7)
+        self.assertEqual(
+            search.search(Note.objects, self.authors[0].pk, 'заметка', 10), []
+        )
+        Note.objects.create(
+            title='Заметка', text='Текст', slug='note-0',
+            author=self.authors[0],
+        )
+        self.action('restore_notes', notes)
+        self.assertEqual(Note.objects.count(), 8)
+        restored = Note.objects.exclude(title='Заметка').filter(
+            author=self.authors[0], slug__startswith='note-0'
+        ).get()
+        self.assertNotEqual(restored.slug, 'note-0')
+        found = search.search(Note.objects, self.authors[0].pk, 'заметка', 10)
+        self.assertEqual(len(found), 3)
+
+    def test_delete_selected_is_disabled(self):
+        self.action('delete_selected', Note.objects.all()[:1])
+        self.assertEqual(Note.all_objects.count(), 7)
+        self.assertNotContains(
+            self.client.get(CHANGELIST_URL), 'delete_selected'
+        )
@@ -0,0 +1,187 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes import search
+from notes.models import Note
+
+User = get_user_model()
+
+LIST_URL = reverse('api:notes')
+CREATE_URL = reverse('api:batch_create')
+UPDATE_URL = reverse('api:batch_update')
+DELETE_URL = reverse('api:batch_delete')
+
+
+class NoteApiTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+        for number in range(5):
+            Note.objects.create(
+                title=f'Заметка {number}', text=f'Текст {number}',
+                slug=f'note-{number}', author=cls.author,
+            )
+        cls.note = Note.objects.filter(author=cls.author).first()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.author)
+
+    def post(self, url, payload):
+        return self.client.post(
+            url, json.dumps(payload), content_type='application/json'
+        )
+
+    def test_anonymous_gets_401(self):
+        self.client.logout()
+        for url in (LIST_URL, reverse('api:note', args=('note-0',))):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_list_pages_by_cursor(self):
+        response = self.client.get(LIST_URL, {'limit': 3})
+        first = response.json()
+        self.assertEqual(len(first['results']), 3)
+        self.assertIsNone(first['previous'])
+        second = self.client.get(
+            LIST_URL, {'limit': 3, 'cursor': first['next']}
+        ).json()
+        self.assertEqual(
+            [note['slug'] for note in first['results'] + second['results']],
+            [f'note-{number}' for number in range(5)],
+        )
+        self.assertIsNone(second['next'])
+
+    def test_fields_selection(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(LIST_URL, {'fields': 'id,title'})
+        self.assertFalse(any(
+            'notes_notebody' in query['sql'] for query in queries
+        ))
+        self.assertEqual(
+            response.json()['results'][0],
+            {'id': self.note.pk, 'title': self.note.title},
+        )
+        response = self.client.get(
+            reverse('api:note', args=(self.note.slug,)), {'fields': 'text'}
+        )
+        self.assertEqual(response.json(), {'text': 'Текст 0'})
+        response = self.client.get(LIST_URL, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_only_own_notes(self):
+        self.client.force_login(self.reader)
+        self.assertEqual(self.client.get(LIST_URL).json()['results'], [])
+        response = self.client.get(reverse('api:note', args=(self.note.slug,)))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.post(UPDATE_URL, {'notes': [
+            {'id': self.note.pk, 'title': 'Чужая'},
+        ]})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = self.post(DELETE_URL, {'ids': [self.note.pk]})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertTrue(Note.objects.filter(pk=self.note.pk).exists())
+
+    def test_batch_create(self):
+        response = self.post(CREATE_URL, {'notes': [
+            {'title': f'Пакет {number}', 'text': 'Текст'}
+            for number in range(20)
+        ]})
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        results = response.json()['results']
+        self.assertEqual(len(results), 20)
+        self.assertEqual(results[0]['slug'], 'paket-0')
+        self.assertEqual(
+            Note.objects.filter(title__startswith='Пакет').count(), 20
+        )
+
+    def test_invalid_batch_is_rolled_back(self):
+        response = self.post(CREATE_URL, {'notes': [
+            {'title': 'Новая', 'text': 'Текст', 'slug': 'new'},
+            {'title': 'Без текста'},
+            {'title': 'Занятый адрес', 'text': 'Текст', 'slug': 'note-1'},
+        ]})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        errors = response.json()['errors']
+        self.assertEqual(set(errors), {'1', '2'})
+        self.assertIn('text', errors['1'])
+        self.assertIn('slug', errors['2'])
+        self.assertFalse(Note.objects.filter(slug='new').exists())
+
+    def test_batch_update_keeps_missing_fields(self):
+        response = self.post(UPDATE_URL, {'notes': [
+            {'id': self.note.pk, 'title': 'Новый заголовок'},
+        ]})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        note = Note.objects.get(pk=self.note.pk)
+        self.assertEqual(
+            (note.title, note.text, note.slug),
+            ('Новый заголовок', 'Текст 0', 'note-0'),
+        )
+
+    def test_batch_delete(self):
+        pks = list(Note.objects.values_list('pk', flat=True)[:3])
+        response = self.post(DELETE_URL, {'ids': pks})
+        self.assertEqual(response.json(), {'deleted': 3})
+        self.assertEqual(Note.objects.count(), 2)
+        self.assertEqual(
+            len(search.search(Note.objects, self.author.pk, 'текст', 10)), 2
+        )
+        response = self.post(DELETE_URL, {'ids': [pks[0]]})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_malformed_ids(self):
+        bad_ids = [[1], {'id': 1}, '1', True, 1.5, 2 ** 63, None]
+        for url, payload in (
+            (DELETE_URL, {'ids': [self.note.pk, *bad_ids]}),
+            (UPDATE_URL, {'notes': [
+                {'id': self.note.pk, 'title': 'Новый заголовок'},
+                *({'id': pk} for pk in bad_ids),
+            ]}),
+        ):
+            with self.subTest(url=url):
+                response = self.post(url, payload)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+                errors = response.json()['errors']
+                self.assertEqual(
+                    set(errors), {str(index) for index in range(1, 8)}
+                )
+                self.assertIn('id', errors['1'])
+        self.assertEqual(Note.objects.get(pk=self.note.pk).title, 'Заметка 0')
+        self.assertEqual(Note.objects.count(), 5)
+
+    def test_fields_must_be_strings(self):
+        for url, item, fields in (
+            (CREATE_URL, {'title': 5, 'text': ['q']}, {'title', 'text'}),
+            (UPDATE_URL, {'id': self.note.pk, 'title': {'a': 1}}, {'title'}),
+            (UPDATE_URL, {'id': self.note.pk, 'slug': None}, {'slug'}),
+        ):
+            with self.subTest(url=url, item=item):
+                response = self.post(url, {'notes': [item]})
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+                self.assertEqual(set(response.json()['errors']['0']), fields)
+        self.assertEqual(Note.objects.get(pk=self.note.pk).title, 'Заметка 0')
+        self.assertEqual(Note.objects.count(), 5)
+
+    @override_settings(NOTES_API_BATCH_SIZE=2)
+    def test_batch_limit(self):
+        response = self.post(CREATE_URL, {'notes': [
+            {'title': 'Заметка', 'text': 'Текст'} for _ in range(3)
+        ]})
+        self.assertEqual(
+            response.status_code, HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        )
+        response = self.client.post(
+            CREATE_URL, 'не json', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
@@ -0,0 +1,129 @@
+import asyncio
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes import metrics
+from notes.forms import WARNING
+from notes.models import Note
+
+User = get_user_model()
+
+
+@override_settings(ROOT_URLCONF='tests.async_urls')
+class AsyncViewsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', author=cls.author,
+            slug='test-slug',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.async_client.force_login(self.author)
+
+    async def test_list_and_detail(self):
+        response = await self.async_client.get(reverse('notes:list'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn(self.note, response.context['object_list'])
+        response = await self.async_client.get(
+            reverse('notes:detail', args=(self.note.slug,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, self.note.text)
+        self.assertIn('ETag', response.headers)
+
+    async def test_detail_not_modified(self):
+        url = reverse('notes:detail', args=(self.note.slug,))
+        response = await self.async_client.get(url)
+        response = await self.async_client.get(
+            url, headers={'if-none-match': response.headers['ETag']}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    async def test_anonymous_redirected_to_login(self):
+        await self.async_client.alogout()
+        url = reverse('notes:list')
+        response = await self.async_client.get(url)
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={url}',
+            fetch_redirect_response=False,
+        )
+
+    async def test_other_author_gets_404(self):
+        await self.async_client.aforce_login(self.reader)
+        for name in ('notes:detail', 'notes:edit', 'notes:delete'):
+            with self.subTest(name=name):
+                response = await self.async_client.get(
+                    reverse(name, args=(self.note.slug,))
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    async def test_create_update_delete(self):
+        response = await self.async_client.post(reverse('notes:add'), {
+            'title': 'Новая заметка', 'text': 'Текст',
+        })
+        self.assertRedirects(
+            response, reverse('notes:success'), fetch_redirect_response=False
+        )
+        note = await Note.objects.aget(
+            author=self.author, title='Новая заметка'
+        )
+        self.assertEqual(note.slug, 'novaya-zametka')
+
+        response = await self.async_client.post(
+            reverse('notes:edit', args=(note.slug,)),
+            {'title': 'Новая заметка', 'text': 'Другой текст', 'slug': 'new'},
+        )
+        self.assertRedirects(
+            response, reverse('notes:success'), fetch_redirect_response=False
+        )
+        note = await Note.objects.select_related('body').aget(pk=note.pk)
+        self.assertEqual((note.slug, note.text), ('new', 'Другой текст'))
+
+        response = await self.async_client.post(
+            reverse('notes:delete', args=(note.slug,))
+        )
+        self.assertRedirects(
+            response, reverse('notes:success'), fetch_redirect_response=False
+        )
+        self.assertFalse(await Note.objects.filter(pk=note.pk).aexists())
+
+    async def test_slug_conflict_shows_form_error(self):
+        response = await self.async_client.post(reverse('notes:add'), {
+            'title': 'Другая', 'text': 'Текст', 'slug': self.note.slug,
+        })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFormError(
+            response.context['form'], 'slug',
+            self.note.slug + WARNING,
+        )
+
+    async def test_metrics_count_async_queries(self):
+        metrics.reset()
+        await self.async_client.get(reverse('notes:list'))
+        queries = metrics.snapshot()['notes:list']['queries']
+        self.assertEqual(queries['count'], 1)
+        self.assertGreater(queries['max'], 2)
+
+    @override_settings(NOTES_PAGE_CACHE_TIMEOUT=0)
+    async def test_metrics_of_concurrent_requests(self):
+        url = reverse('notes:detail', args=(self.note.slug,))
+        # Первый ответ кладёт сессию и пользователя в кэш.
+        await self.async_client.get(url)
+        metrics.reset()
+        await self.async_client.get(url)
+        single = metrics.snapshot()['notes:detail']['queries']['max']
+        metrics.reset()
+        await asyncio.gather(*(self.async_client.get(url) for _ in range(20)))
+        queries = metrics.snapshot()['notes:detail']['queries']
+        self.assertEqual(queries['count'], 20)
+        self.assertEqual(queries['max'], single)
+        self.assertEqual(queries['mean'], single)
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from notes import auth
+
+User = get_user_model()
+
+
+class CachedUserTest(TestCase):
+    LIST_URL = reverse('notes:list')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Автор')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.client.get(self.LIST_URL)
+
+    def cached(self):
+        return cache.get(auth.USER_KEY.format(user_id=self.user.pk))
+
+    def test_user_is_cached(self):
+        self.assertEqual(self.cached(), self.user)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('notes:success'))
+
+    def test_password_change_ends_sessions(self):
+        self.user.set_password('новый-пароль')
+        self.user.save()
+        self.assertIsNone(self.cached())
+        response = self.client.get(self.LIST_URL)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_deactivated_user_is_logged_out(self):
+        self.user.is_active = False
+        self.user.save(update_fields=('is_active',))
+        response = self.client.get(self.LIST_URL)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_logout_forgets_user(self):
+        self.client.post(reverse('users:logout'))
+        self.assertIsNone(self.cached())
+
+    def test_sessions_of_model_backend_stay_logged_in(self):
+        self.client.force_login(
+            self.user, backend='django.contrib.auth.backends.ModelBackend'
+        )
+        response = self.client.get(self.LIST_URL)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_failed_login_checks_password_once(self):
+        for username in (self.user.username, 'Незнакомец'):
+            with self.subTest(username=username):
+                with mock.patch(
+                    'django.contrib.auth.base_user.make_password',
+                    wraps=make_password,
+                ) as hash_password, mock.patch.object(
+                    User, 'check_password', autospec=True, return_value=False,
+                ) as check_password, self.assertNumQueries(1):
+                    self.assertIsNone(
+                        authenticate(username=username, password='неверный')
+                    )
+                # Неизвестному пользователю пароль хешируется для
+                # одинакового времени ответа.
+                self.assertEqual(
+                    hash_password.call_count + check_password.call_count, 1
+                )
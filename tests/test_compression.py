@@ -0,0 +1,98 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note, NoteBody
+
+User = get_user_model()
+
+LONG_TEXT = '\n'.join(
+    f'строка журнала номер {number}' for number in range(500)
+)
+
+
+@override_settings(NOTES_TEXT_COMPRESS_OVER=1024)
+class NoteTextCompressionTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+
+    def create_note(self, text, slug='note'):
+        return Note.objects.create(
+            title='Заметка', text=text, slug=slug, author=self.author
+        )
+
+    def stored(self, note):
+        return NoteBody.objects.filter(pk=note.pk).values_list(
+            'text', 'text_zlib'
+        ).get()
+
+    def test_long_text_is_stored_compressed(self):
+        note = self.create_note(LONG_TEXT)
+        text, text_zlib = self.stored(note)
+        self.assertEqual(text, '')
+        self.assertLess(len(text_zlib), len(LONG_TEXT.encode()) // 4)
+        self.assertEqual(note.text, LONG_TEXT)
+        self.assertEqual(Note.objects.get(pk=note.pk).text, LONG_TEXT)
+
+    def test_short_text_is_stored_as_is(self):
+        note = self.create_note('Короткий текст')
+        self.assertEqual(self.stored(note), ('Короткий текст', None))
+
+    def test_text_is_decompressed_on_access(self):
+        self.create_note(LONG_TEXT)
+        body = NoteBody.objects.get()
+        self.assertEqual(body.__dict__['text'], '')
+        self.assertEqual(body.text, LONG_TEXT)
+        body = NoteBody.objects.defer('text', 'text_zlib').get()
+        with self.assertNumQueries(1):
+            self.assertEqual(body.text, LONG_TEXT)
+
+    def test_edit_switches_storage(self):
+        note = self.create_note(LONG_TEXT)
+        note = Note.objects.get(pk=note.pk)
+        note.text = 'Короткий текст'
+        note.save(update_fields=('text',))
+        self.assertEqual(self.stored(note), ('Короткий текст', None))
+        note.text = LONG_TEXT
+        note.save()
+        self.assertEqual(self.stored(note)[0], '')
+
+    def test_detail_and_revisions_see_full_text(self):
+        note = self.create_note(LONG_TEXT)
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('notes:detail', args=(note.slug,)))
+        self.assertContains(response, 'строка журнала номер 499')
+        self.client.post(reverse('notes:edit', args=(note.slug,)), {
+            'title': 'Заметка', 'text': LONG_TEXT + '\nещё строка',
+            'slug': note.slug,
+        })
+        # Предыдущий текст взят из сжатой колонки, поэтому ревизия —
+        # разница, а не снимок.
+        self.assertFalse(note.revisions.latest('number').is_snapshot)
+
+    def test_compress_notes_command(self):
+        with override_settings(NOTES_TEXT_COMPRESS_OVER=None):
+            old = self.create_note(LONG_TEXT, slug='old')
+            short = self.create_note('Короткий текст', slug='short')
+        out = StringIO()
+        call_command('compress_notes', batch_size=1, pause=0, stdout=out)
+        self.assertEqual(self.stored(old)[0], '')
+        self.assertEqual(self.stored(short), ('Короткий текст', None))
+        self.assertEqual(Note.objects.get(pk=old.pk).text, LONG_TEXT)
+        self.assertIn('Сжато заметок: 1.', out.getvalue())
+
+    def test_export_writes_full_text(self):
+        self.create_note(LONG_TEXT)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'notes.jsonl'
+            call_command('notes_export', str(path), stderr=StringIO())
+            row = json.loads(path.read_text(encoding='utf-8'))
+        self.assertEqual(row['text'], LONG_TEXT)
@@ -1,5 +1,19 @@
+from http import HTTPStatus
+from tempfile import TemporaryDirectory
+
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from notes import caching
 from notes.forms import NoteForm
-from .common_test import BaseTestContent
+from notes.models import Folder, Note, Tag
+from .common_test import (
+    CONTENT_BUDGETS, BaseTestContent, QueryBudgetMixin, create_large_dataset
+)
 
 
 class TestContent(BaseTestContent):
@@ -40,4 +54,341 @@ class TestContent(BaseTestContent):
         self.assertEqual(form.instance, self.note)
         self.assertEqual(form.initial.get('title'), self.note.title)
         self.assertEqual(form.initial.get('text'), self.note.text)
-        self.assertEqual(form.initial.get('slug'), self.note.slug)
\ No newline at end of file
+        self.assertEqual(form.initial.get('slug'), self.note.slug)
+
+
+class TestContentBudgets(QueryBudgetMixin, BaseTestContent):
+    """Бюджеты страниц списка и форм на большом наборе данных."""
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        create_large_dataset(cls.author)
+
+    def test_budgets(self):
+        for name, (queries, ms) in CONTENT_BUDGETS.items():
+            args = (self.note.slug,) if name == 'notes:edit' else None
+            with self.subTest(name=name):
+                with self.assertBudget(queries, ms):
+                    response = self.client.get(reverse(name, args=args))
+                if name == 'notes:list':
+                    self.assertEqual(
+                        len(response.context['object_list']),
+                        settings.NOTES_PER_PAGE,
+                    )
+                else:
+                    self.assertIsInstance(response.context['form'], NoteForm)
+
+
+class TestNotesPagination(BaseTestContent):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {i}', text='Текст', slug=f'note-{i}',
+                 author=cls.author)
+            for i in range(settings.NOTES_PER_PAGE + 5)
+        )
+
+    def test_first_page_is_limited(self):
+        response = self.client.get(self.NOTE_LIST_URL)
+        page = response.context['page_obj']
+        self.assertEqual(len(response.context['object_list']),
+                         settings.NOTES_PER_PAGE)
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_next_and_previous_cursors(self):
+        first = self.client.get(self.NOTE_LIST_URL).context['page_obj']
+        response = self.client.get(
+            self.NOTE_LIST_URL, {'cursor': first.next_cursor}
+        )
+        second = response.context['page_obj']
+        self.assertEqual(len(second), 6)
+        self.assertFalse(second.has_next())
+        self.assertGreater(second.object_list.first().pk,
+                           max(note.pk for note in first))
+        response = self.client.get(
+            self.NOTE_LIST_URL, {'cursor': second.previous_cursor}
+        )
+        self.assertEqual(
+            [note.pk for note in response.context['page_obj']],
+            [note.pk for note in first],
+        )
+
+    def test_list_does_not_load_text(self):
+        response = self.client.get(self.NOTE_LIST_URL)
+        for note in response.context['object_list']:
+            self.assertFalse(Note.body.is_cached(note))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.NOTE_LIST_URL, {'cursor': '!!!'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class TestNoteSearch(BaseTestContent):
+    SEARCH_URL = reverse('notes:search')
+
+    def search(self, query):
+        response = self.client.get(self.SEARCH_URL, {'q': query})
+        return list(response.context['notes'])
+
+    def test_author_finds_note_by_word_prefix(self):
+        notes = self.search('текс')
+        self.assertEqual(notes, [self.note])
+        self.assertIn('<mark>', notes[0].snippet)
+
+    def test_other_user_does_not_find_note(self):
+        self.login_reader()
+        self.assertEqual(self.search('текст'), [])
+
+    def test_index_follows_edit_and_delete(self):
+        self.client.post(self.get_edit_url(self.note.slug), {
+            'title': 'Список покупок', 'text': 'Молоко', 'slug': 'list',
+        })
+        self.assertEqual(self.search('текст'), [])
+        self.assertEqual(len(self.search('молоко')), 1)
+        self.client.post(self.get_delete_url('list'))
+        self.assertEqual(self.search('молоко'), [])
+
+    def test_snippet_is_escaped(self):
+        Note.objects.create(title='Скрипт', text='<script>текст</script>',
+                            author=self.author)
+        notes = self.search('скрипт')
+        self.assertNotIn('<script>', notes[0].snippet)
+
+
+class TestPageCache(BaseTestContent):
+
+    def test_second_request_is_served_from_cache(self):
+        detail_url = reverse('notes:detail', args=(self.note.slug,))
+        for url in (self.NOTE_LIST_URL, detail_url):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                second = self.client.get(url)
+                self.assertIsNotNone(first.context)
+                self.assertIsNone(second.context)
+                self.assertEqual(first.content, second.content)
+        self.assertEqual(caching.get_stats()['hits'], 2)
+
+    def test_edit_invalidates_pages(self):
+        self.client.get(self.NOTE_LIST_URL)
+        self.client.post(self.get_edit_url(self.note.slug),
+                         dict(self.form_data, slug=self.note.slug))
+        response = self.client.get(self.NOTE_LIST_URL)
+        self.assertContains(response, self.form_data['title'])
+
+    def test_pages_are_cached_per_user(self):
+        self.client.get(self.NOTE_LIST_URL)
+        self.login_reader()
+        response = self.client.get(self.NOTE_LIST_URL)
+        self.assertNotContains(response, self.note.title)
+
+    def test_file_based_backend(self):
+        with TemporaryDirectory() as location, override_settings(CACHES={
+            'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            },
+        }):
+            self.client.get(self.NOTE_LIST_URL)
+            self.assertIsNone(self.client.get(self.NOTE_LIST_URL).context)
+            self.note.delete()
+            response = self.client.get(self.NOTE_LIST_URL)
+            self.assertNotContains(response, self.note.title)
+
+
+class TestTagsAndFolders(BaseTestContent):
+
+    def create_notes(self, count, tags_per_note):
+        folder = Folder.objects.create(author=self.author, name='Папка')
+        tags = Tag.objects.bulk_create(
+            Tag(author=self.author, name=f'тег {number}')
+            for number in range(tags_per_note)
+        )
+        for number in range(count):
+            note = Note.objects.create(
+                title=f'Заметка {number}', text='Текст',
+                author=self.author, folder=folder,
+            )
+            note.tags.set(tags)
+        return folder, tags
+
+    def get_list(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.NOTE_LIST_URL, params)
+        return response, len(queries)
+
+    def test_form_creates_folder_and_tags(self):
+        self.client.post(self.ADD_URL, dict(
+            self.form_data, folder_name='Работа', tag_names='план, идеи, план'
+        ))
+        note = Note.objects.get(slug=self.form_data['slug'])
+        self.assertEqual(note.folder.name, 'Работа')
+        self.assertEqual(note.get_tag_names(), 'идеи, план')
+        self.client.post(self.get_edit_url(note.slug), dict(
+            self.form_data, folder_name='', tag_names='идеи, отчёт'
+        ))
+        note = Note.objects.get(pk=note.pk)
+        self.assertIsNone(note.folder)
+        self.assertEqual(note.get_tag_names(), 'идеи, отчёт')
+        self.assertEqual(Tag.objects.filter(author=self.author).count(), 3)
+
+    def test_list_queries_do_not_grow_with_notes_and_tags(self):
+        # Сессия и пользователь в кэше, а страницы списка в нём нет.
+        self.client.get(self.NOTE_LIST_URL)
+        caching.bump_version(self.author.pk)
+        _, few = self.get_list()
+        self.create_notes(settings.NOTES_PER_PAGE, tags_per_note=5)
+        response, many = self.get_list()
+        self.assertEqual(many, few)
+        # Первая заметка страницы — self.note без тегов.
+        self.assertContains(
+            response, 'тег 4', count=settings.NOTES_PER_PAGE - 1
+        )
+
+    def test_filter_by_folder_and_tag(self):
+        folder, tags = self.create_notes(settings.NOTES_PER_PAGE + 1, 1)
+        for params in ({'folder': folder.pk}, {'tag': tags[0].pk}):
+            with self.subTest(params=params):
+                response = self.client.get(self.NOTE_LIST_URL, params)
+                notes = response.context['object_list']
+                self.assertNotIn(self.note, notes)
+                self.assertEqual(len(notes), settings.NOTES_PER_PAGE)
+                next_url = (
+                    f'?{urlencode(params)}&cursor='
+                    f'{response.context["page_obj"].next_cursor}'
+                )
+                self.assertContains(response, next_url.replace('&', '&amp;'))
+                response = self.client.get(self.NOTE_LIST_URL + next_url)
+                self.assertEqual(len(response.context['object_list']), 1)
+        self.login_reader()
+        response = self.client.get(self.NOTE_LIST_URL, {'tag': tags[0].pk})
+        self.assertEqual(list(response.context['object_list']), [])
+
+    def test_invalid_filters_are_not_found(self):
+        for params in (
+            {'folder': 'папка'},
+            {'folder': '9' * 20},
+            {'tag': '-' + '9' * 20},
+            {'tag': str(2 ** 63)},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.NOTE_LIST_URL, params)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_tag_change_invalidates_list(self):
+        tag = Tag.objects.create(author=self.author, name='новый')
+        self.client.get(self.NOTE_LIST_URL)
+        self.note.tags.add(tag)
+        self.assertContains(self.client.get(self.NOTE_LIST_URL), 'новый')
+
+
+class TestHomeRecentNotes(BaseTestContent):
+    HOME_URL = reverse('notes:home')
+
+    @override_settings(NOTES_COUNT_ON_HOME_PAGE=2)
+    def test_shows_last_updated_notes(self):
+        for number in range(3):
+            Note.objects.create(title=f'Заметка {number}', text='Текст',
+                                author=self.author)
+        self.note.title = 'Изменённая'
+        self.note.save()
+        Note.objects.create(title='Чужая', text='Текст', author=self.reader)
+        notes = self.client.get(self.HOME_URL).context['recent_notes']
+        self.assertEqual(
+            [note.title for note in notes], ['Изменённая', 'Заметка 2']
+        )
+
+    def test_one_query_then_cache(self):
+        # Первый запрос кладёт сессию и пользователя в кэш.
+        self.client.get(self.NOTE_LIST_URL)
+        with self.assertNumQueries(1):
+            self.client.get(self.HOME_URL)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.HOME_URL)
+        self.assertContains(response, self.note.title)
+
+    def test_delete_updates_widget(self):
+        self.client.get(self.HOME_URL)
+        self.client.post(self.get_delete_url(self.note.slug))
+        response = self.client.get(self.HOME_URL)
+        self.assertNotContains(response, self.note.title)
+
+    def test_anonymous_page_is_not_cached(self):
+        self.client.logout()
+        response = self.client.get(self.HOME_URL)
+        self.assertNotIn('recent_notes', response.context)
+        self.assertEqual(caching.get_stats()['misses'], 0)
+
+
+class TestConditionalResponses(BaseTestContent):
+    # Сессия и пользователь уже в кэше после первого запроса.
+    AUTH_QUERIES = 0
+
+    def get_detail_url(self):
+        return reverse('notes:detail', args=(self.note.slug,))
+
+    def test_list_not_modified_without_note_queries(self):
+        etag = self.client.get(self.NOTE_LIST_URL)['ETag']
+        with self.assertNumQueries(self.AUTH_QUERIES):
+            response = self.client.get(self.NOTE_LIST_URL,
+                                       HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_detail_not_modified_with_one_query(self):
+        response = self.client.get(self.get_detail_url())
+        for header, value in (
+            ('HTTP_IF_NONE_MATCH', response['ETag']),
+            ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified']),
+        ):
+            with self.subTest(header=header):
+                with self.assertNumQueries(self.AUTH_QUERIES + 1):
+                    response = self.client.get(self.get_detail_url(),
+                                               **{header: value})
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+
+    def test_edit_changes_validators(self):
+        list_etag = self.client.get(self.NOTE_LIST_URL)['ETag']
+        detail_etag = self.client.get(self.get_detail_url())['ETag']
+        self.note.text = 'Новый текст'
+        self.note.save()
+        for url, etag in (
+            (self.NOTE_LIST_URL, list_etag),
+            (self.get_detail_url(), detail_etag),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_username_change_changes_validators(self):
+        list_etag = self.client.get(self.NOTE_LIST_URL)['ETag']
+        detail_etag = self.client.get(self.get_detail_url())['ETag']
+        self.assertNotIn('notes:', list_etag)
+        self.author.username = 'Новое имя'
+        self.author.save()
+        for url, etag in (
+            (self.NOTE_LIST_URL, list_etag),
+            (self.get_detail_url(), detail_etag),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, 'Новое имя')
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }})
+    def test_no_etag_without_stored_version(self):
+        for url in (self.NOTE_LIST_URL, self.get_detail_url()):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertNotIn('ETag', response.headers)
+        self.assertIn('Last-Modified', response.headers)
+
+    def test_timestamps(self):
+        self.assertIsNotNone(self.note.created)
+        self.assertGreaterEqual(self.note.updated, self.note.created)
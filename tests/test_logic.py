@@ -1,9 +1,24 @@
+import re
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from pytils.translit import slugify
-from notes.models import Note
+from notes.forms import WARNING
+from notes import search, slugs, translit
+from notes.models import Note, NoteBody
+from notes.slugs import slug_cache_info, slugify_title, transliterate
 
 User = get_user_model()
 
@@ -36,6 +51,28 @@ class NoteCreationTest(TestCase):
         self.assertEqual(new_note.slug, self.form_data['slug'])
         self.assertEqual(new_note.author, self.author)
 
+    def test_create_writes_note_once(self):
+        self.client.force_login(self.author)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('notes:add'), data=self.form_data)
+        # executemany попадает в журнал как «N times: SQL».
+        statements = [
+            re.sub(r'^\d+ times: ', '', query['sql']).split(' (')[0]
+            for query in queries
+        ]
+        writes = [
+            sql for sql in statements
+            if sql.startswith(('INSERT', 'UPDATE', 'DELETE'))
+        ]
+        # Заметка и её текст — по одному INSERT, ни одного UPDATE;
+        # у новой заметки нечего удалять из поискового индекса.
+        self.assertEqual(writes, [
+            'INSERT INTO "notes_note"',
+            'INSERT INTO notes_note_fts',
+            'INSERT INTO "notes_noterevision"',
+            'INSERT INTO "notes_notebody"',
+        ])
+
 
 class NoteEditDeleteTest(TestCase):
 
@@ -65,6 +102,58 @@ class NoteEditDeleteTest(TestCase):
         self.assertEqual(self.note.text, self.edit_data['text'])
         self.assertEqual(self.note.slug, self.edit_data['slug'])
 
+    def get_edit_writes(self, data):
+        self.client.force_login(self.author)
+        url = reverse('notes:edit', args=(self.note.slug,))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url, data)
+        return [
+            query['sql'] for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'SAVEPOINT'))
+        ]
+
+    def test_edit_writes_only_changed_fields(self):
+        writes = self.get_edit_writes({
+            'title': 'Новый заголовок',
+            'text': self.note.text,
+            'slug': self.note.slug,
+        })
+        updates = [sql for sql in writes if sql.startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertRegex(
+            updates[0], r'^UPDATE "notes_note" SET "title" = .+, "updated" = '
+        )
+        self.assertNotIn('"slug"', updates[0])
+        self.assertEqual(Note.objects.get().title, 'Новый заголовок')
+
+    def test_unchanged_edit_writes_nothing(self):
+        writes = self.get_edit_writes({
+            'title': self.note.title,
+            'text': self.note.text,
+            'slug': self.note.slug,
+        })
+        self.assertEqual(writes, [])
+        updated = self.note.updated
+        note = Note.objects.select_related('body').get()
+        with self.assertNumQueries(0):
+            note.save()
+        self.assertEqual(Note.objects.get().updated, updated)
+
+    def test_save_after_refresh_writes_nothing(self):
+        note = Note.objects.get()
+        Note.objects.filter(pk=note.pk).update(title='Заголовок из базы')
+        note.refresh_from_db()
+        with self.assertNumQueries(0):
+            note.save()
+        self.assertEqual(Note.objects.get().updated, self.note.updated)
+
+    def test_save_after_deferred_load_writes_nothing(self):
+        note = Note.objects.only('id', 'title').get()
+        self.assertEqual(note.slug, self.note.slug)
+        with self.assertNumQueries(0):
+            note.save()
+        self.assertEqual(Note.objects.get().updated, self.note.updated)
+
     def test_other_user_cant_edit_note(self):
         self.client.force_login(self.reader)
         url = reverse('notes:edit', args=(self.note.slug,))
@@ -112,8 +201,281 @@ class NoteSlugTest(TestCase):
         self.client.force_login(self.user)
         self.client.post(reverse('notes:add'), data=self.form_data)
         response = self.client.post(reverse('notes:add'), data=self.form_data)
-        self.assertEqual(Note.objects.count(), 1)
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertEqual(Note.objects.count(), 2)
         expected_slug = slugify(self.form_data['title'])[:100]
-        warning_message = expected_slug + ' - такой slug уже существует, '
-        'придумайте уникальное значение!'
-        self.assertContains(response, warning_message)
+        # Повторный заголовок получает slug со случайным суффиксом:
+        second = Note.objects.exclude(slug=expected_slug).get()
+        self.assertTrue(second.slug.startswith(expected_slug + '-'))
+
+    def test_not_unique_explicit_slug(self):
+        self.client.force_login(self.user)
+        form_data = dict(self.form_data, slug='note-slug')
+        self.client.post(reverse('notes:add'), data=form_data)
+        response = self.client.post(reverse('notes:add'), data=form_data)
+        self.assertEqual(Note.objects.count(), 1)
+        self.assertContains(response, 'note-slug' + WARNING)
+
+    def test_slug_allocation_without_select(self):
+        with CaptureQueriesContext(connection) as queries:
+            Note.objects.create(title='Заголовок', text='Текст',
+                                author=self.user)
+        self.assertFalse(
+            [query for query in queries if query['sql'].startswith('SELECT')]
+        )
+
+    def test_slug_conflict_retries_with_suffix(self):
+        taken = slugify('Заголовок')
+        Note.objects.create(title='Другой', text='Текст', slug=taken,
+                            author=self.user)
+        note = Note.objects.create(title='Заголовок', text='Текст',
+                                   author=self.user)
+        self.assertNotEqual(note.slug, taken)
+        self.assertTrue(note.slug.startswith(taken + '-'))
+        self.assertLessEqual(len(note.slug), 100)
+
+    def test_bulk_slugs_suffix_the_base_slug(self):
+        base = slugify('Заголовок')
+        for slug in (base, f'{base}-first1'):
+            Note.objects.create(title='Другой', text='Текст', slug=slug,
+                                author=self.user)
+        note = Note(title='Заголовок', text='Текст', author=self.user)
+        with mock.patch.object(
+            slugs, 'get_random_string', side_effect=['first1', 'again2']
+        ):
+            slugs.allocate_bulk_slugs([note])
+        self.assertEqual(note.slug, f'{base}-again2')
+
+    def test_only_author_slug_constraint_is_slug_conflict(self):
+        for message, expected in (
+            ('UNIQUE constraint failed: notes_note.author_id, '
+             'notes_note.slug', True),
+            ('duplicate key value violates unique constraint '
+             '"note_author_slug_uniq"', True),
+            ('NOT NULL constraint failed: notes_note.slug', False),
+            ('UNIQUE constraint failed: notes_folder.author_id, '
+             'notes_folder.name', False),
+        ):
+            with self.subTest(message=message):
+                self.assertEqual(
+                    slugs.is_slug_conflict(IntegrityError(message)), expected
+                )
+
+
+class NoteQueryPlanTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+
+    def test_views_use_indexes(self):
+        out = StringIO()
+        call_command('explain_notes', username=self.author.username,
+                     stdout=out)
+        plan = out.getvalue()
+        self.assertIn('note_author_list_idx', plan)
+        self.assertIn('note_author_recent_idx', plan)
+        self.assertIn('note_folder_idx', plan)
+        # note_tag_uniq без условия SQLite создаёт как autoindex.
+        self.assertIn('COVERING INDEX sqlite_autoindex_notes_notetag', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertNotIn('SCAN notes_note', plan)
+
+
+class NoteSoftDeleteTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+
+    def setUp(self):
+        self.note = Note.objects.create(
+            title='Покупки', text='Молоко', slug='shopping', author=self.author
+        )
+
+    def test_delete_hides_note_but_keeps_row(self):
+        self.client.force_login(self.author)
+        self.client.post(reverse('notes:delete', args=(self.note.slug,)))
+        self.assertFalse(Note.objects.filter(pk=self.note.pk).exists())
+        note = Note.all_objects.get(pk=self.note.pk)
+        self.assertIsNotNone(note.deleted)
+        self.assertEqual(
+            search.search(Note.objects, self.author.pk, 'молоко', 10), []
+        )
+        response = self.client.get(reverse('notes:detail', args=('shopping',)))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_slug_is_free_after_delete(self):
+        self.note.soft_delete()
+        note = Note.objects.create(
+            title='Покупки', text='Хлеб', slug='shopping', author=self.author
+        )
+        self.assertEqual(note.slug, 'shopping')
+
+    def test_restore_takes_free_slug(self):
+        self.note.soft_delete()
+        Note.objects.create(
+            title='Покупки', text='Хлеб', slug='shopping', author=self.author
+        )
+        self.note.restore()
+        self.assertIsNone(self.note.deleted)
+        self.assertTrue(self.note.slug.startswith('shopping-'))
+        self.assertEqual(
+            len(search.search(Note.objects, self.author.pk, 'молоко', 10)), 1
+        )
+
+    def test_purge_removes_only_expired_notes(self):
+        Note.objects.bulk_create(
+            Note(title='Старая', text='Текст', slug=f'old-{number}',
+                 author=self.author,
+                 deleted=timezone.now() - timedelta(days=31))
+            for number in range(5)
+        )
+        self.note.soft_delete()
+        out = StringIO()
+        call_command('purge_notes', batch_size=2, pause=0, stdout=out)
+        self.assertIn('5', out.getvalue())
+        self.assertEqual(
+            list(Note.all_objects.values_list('slug', flat=True)),
+            ['shopping'],
+        )
+
+    def test_purge_uses_partial_index(self):
+        plan = Note.all_objects.filter(
+            deleted__lt=timezone.now()
+        ).values_list('pk').explain()
+        self.assertIn('note_deleted_idx', plan)
+
+
+class NoteBodyTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+
+    def test_text_is_stored_in_body(self):
+        note = Note.objects.create(
+            title='Заметка', text='Текст', slug='note', author=self.author
+        )
+        self.assertEqual(NoteBody.objects.get(note=note).text, 'Текст')
+        Note.objects.bulk_create(
+            Note(title='Заметка', text=f'Текст {number}',
+                 slug=f'note-{number}', author=self.author)
+            for number in range(3)
+        )
+        self.assertEqual(
+            NoteBody.objects.filter(text__startswith='Текст ').count(), 3
+        )
+
+    def test_text_is_written_only_when_changed(self):
+        Note.objects.create(
+            title='Заметка', text='Текст', slug='note', author=self.author
+        )
+        note = Note.objects.select_related('body').get()
+        for field, value, written in (
+            ('title', 'Новый заголовок', False),
+            ('text', 'Новый текст', True),
+        ):
+            with self.subTest(field=field):
+                setattr(note, field, value)
+                with CaptureQueriesContext(connection) as queries:
+                    note.save()
+                self.assertEqual(written, any(
+                    query['sql'].startswith('UPDATE "notes_notebody"')
+                    for query in queries
+                ))
+        self.assertEqual(Note.objects.get().text, 'Новый текст')
+
+
+class SlugTransliterationTest(SimpleTestCase):
+    TITLES = (
+        'Заголовок',
+        'Привет, мир! & друзья',
+        'Ёлка — «ёжик» № 5…',
+        'Щука_и_Ь  \tпробелы\n',
+        'İstanbul ß 漢字',
+        '',
+    )
+
+    def test_table_slugify_matches_pytils(self):
+        for title in self.TITLES:
+            with self.subTest(title=title):
+                self.assertEqual(translit.slugify(title), slugify(title))
+
+    def test_transliteration_is_cached(self):
+        transliterate.cache_clear()
+        slugify_title('Заголовок', 100)
+        slugify_title('Заголовок', 100)
+        info = slug_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+
+class NoteImportExportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст\nв две строки', slug='note-slug',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def export_import(self, name, **import_options):
+        path = str(Path(self.tmp_dir.name) / name)
+        call_command('notes_export', path, stderr=StringIO())
+        call_command('notes_import', path, stdout=StringIO(),
+                     **import_options)
+
+    def test_round_trip_to_other_author(self):
+        for name in ('notes.jsonl', 'notes.csv'):
+            with self.subTest(name=name):
+                Note.objects.filter(author=self.reader).delete()
+                self.export_import(name, author=self.reader.username)
+                imported = Note.objects.get(author=self.reader)
+                self.assertEqual(imported.title, self.note.title)
+                self.assertEqual(imported.text, self.note.text)
+                self.assertEqual(imported.slug, self.note.slug)
+
+    def import_file(self, name, content, **options):
+        path = Path(self.tmp_dir.name) / name
+        path.write_text(content, encoding='utf-8')
+        call_command('notes_import', str(path), stdout=StringIO(), **options)
+
+    def test_rows_without_required_columns(self):
+        content = ('title,text,author\n'
+                   'Заголовок,Текст,Автор\n'
+                   'Заголовок,Текст\n')
+        with self.assertRaisesMessage(
+            CommandError, 'Строка 2: нет колонки author.'
+        ):
+            self.import_file('notes.csv', content)
+        self.import_file('notes.csv', content, author=self.reader.username)
+        self.assertEqual(Note.objects.filter(author=self.reader).count(), 2)
+        with self.assertRaisesMessage(
+            CommandError, 'Строка 1: нет колонки title.'
+        ):
+            self.import_file('notes.jsonl', '{"text": "Текст"}\n',
+                             author=self.reader.username)
+
+    def test_conflicting_and_empty_slugs(self):
+        path = Path(self.tmp_dir.name) / 'notes.jsonl'
+        path.write_text(
+            '{"title": "Заголовок", "text": "1", "slug": "note-slug", '
+            '"author": "Автор"}\n'
+            '{"title": "Заголовок", "text": "2", "author": "Автор"}\n'
+            '{"title": "Заголовок", "text": "3", "author": "Автор"}\n',
+            encoding='utf-8',
+        )
+        call_command('notes_import', str(path), stdout=StringIO())
+        slugs = list(
+            Note.objects.filter(author=self.author).values_list('slug',
+                                                                flat=True)
+        )
+        self.assertEqual(len(slugs), 4)
+        self.assertEqual(len(set(slugs)), 4)
+        self.assertIn(slugify('Заголовок'), slugs)
@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes import metrics
+from notes.models import Note
+
+from .common_test import BaseTestContent
+
+User = get_user_model()
+
+
+class HistogramTest(TestCase):
+
+    def test_buckets_and_quantiles(self):
+        histogram = metrics.Histogram((1, 10, 100))
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+        data = histogram.as_dict()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual(
+            data['buckets'], {'1': 1, '10': 2, '100': 1, '+Inf': 1}
+        )
+        self.assertEqual(data['p50'], 10)
+        self.assertEqual(data['p99'], 500)
+
+    def test_query_shape_ignores_in_list_length(self):
+        self.assertEqual(
+            metrics.query_shape('SELECT 1 WHERE id IN (%s, %s, %s)'),
+            metrics.query_shape('SELECT 1 WHERE id IN (%s)'),
+        )
+
+
+class RequestMetricsTest(BaseTestContent):
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+
+    def test_view_metrics_by_url_name(self):
+        for _ in range(2):
+            self.client.get(self.NOTE_LIST_URL)
+        self.client.get(reverse('notes:detail', args=(self.note.slug,)))
+        report = metrics.snapshot()
+        self.assertEqual(report['notes:list']['latency_ms']['count'], 2)
+        self.assertEqual(report['notes:detail']['queries']['count'], 1)
+        self.assertGreater(report['notes:detail']['queries']['max'], 0)
+        self.assertGreater(report['notes:detail']['template_ms']['max'], 0)
+
+    def test_unresolved_url(self):
+        self.client.get('/no-such-page/')
+        self.assertIn(metrics.UNRESOLVED, metrics.snapshot())
+
+    def test_report_is_staff_only(self):
+        url = reverse('notes:metrics')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        staff = User.objects.create(username='Админ', is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(self.NOTE_LIST_URL)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('notes:list', response.json())
+
+    def test_repeated_queries_are_logged(self):
+        recorder = metrics.QueryRecorder(track_shapes=True)
+        with connection.execute_wrapper(recorder):
+            for pk in range(5):
+                list(Note.objects.filter(pk=pk))
+            Note.objects.count()
+        self.assertEqual(recorder.count, 6)
+        with self.assertLogs('notes.metrics', 'WARNING') as logs:
+            recorder.log_repeats('notes:list', 3)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('5 раз', logs.output[0])
+
+    @override_settings(NOTES_METRICS_N_PLUS_ONE=1)
+    def test_pages_have_no_repeated_queries(self):
+        with self.assertNoLogs('notes.metrics', 'WARNING'):
+            self.client.get(self.NOTE_LIST_URL)
+            self.client.get(reverse('notes:detail', args=(self.note.slug,)))
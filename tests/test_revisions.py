@@ -0,0 +1,133 @@
+import random
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes import revisions
+from notes.models import Note, NoteBody, NoteRevision
+
+User = get_user_model()
+
+
+class DeltaTest(TestCase):
+
+    def test_delta_round_trip(self):
+        old = 'первая\nвторая\nтретья\n'
+        for new in (
+            'первая\nновая\nтретья\n', '', old + 'хвост', 'без\r\nконца'
+        ):
+            with self.subTest(new=new):
+                delta = revisions.make_delta(old, new)
+                self.assertEqual(revisions.apply_delta(old, delta), new)
+
+
+@override_settings(NOTES_REVISION_SNAPSHOT_EVERY=5)
+class NoteRevisionTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+
+    def setUp(self):
+        self.note = Note.objects.create(
+            title='Заметка',
+            text='\n'.join(f'строка {number}' for number in range(50)),
+            slug='note',
+            author=self.author,
+        )
+        self.client.force_login(self.author)
+
+    def edit(self, text, title='Заметка'):
+        self.client.post(reverse('notes:edit', args=(self.note.slug,)), {
+            'title': title, 'text': text, 'slug': self.note.slug,
+        })
+
+    def test_every_version_is_reconstructed(self):
+        rng = random.Random(0)
+        lines = self.note.text.splitlines()
+        versions = [self.note.text]
+        for number in range(12):
+            lines[rng.randrange(len(lines))] = f'правка {number}'
+            versions.append('\n'.join(lines))
+            self.edit(versions[-1])
+        stored = list(self.note.revisions.order_by('number'))
+        self.assertEqual(len(stored), len(versions))
+        self.assertEqual(
+            [revision.number for revision in stored if revision.is_snapshot],
+            [1, 6, 11],
+        )
+        for number, text in enumerate(versions, start=1):
+            with self.subTest(number=number):
+                self.assertEqual(
+                    revisions.reconstruct(self.note, number),
+                    ('Заметка', text),
+                )
+
+    def test_number_taken_concurrently_is_retried(self):
+        # Параллельное сохранение успело записать ревизию после того, как
+        # эта прочитала последнюю.
+        last = revisions.last_revision(self.note)
+        with mock.patch.object(
+            revisions, 'last_revision', side_effect=[None, last]
+        ):
+            response = self.client.post(
+                reverse('notes:edit', args=(self.note.slug,)),
+                {'title': 'Заметка', 'text': 'новый текст',
+                 'slug': self.note.slug},
+            )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertEqual(
+            revisions.reconstruct(self.note, 2), ('Заметка', 'новый текст')
+        )
+
+    def test_unchanged_save_adds_no_revision(self):
+        note = Note.objects.get(pk=self.note.pk)
+        note.save()
+        self.edit(self.note.text)
+        self.assertEqual(self.note.revisions.count(), 1)
+
+    def test_untracked_update_falls_back_to_snapshot(self):
+        NoteBody.objects.filter(pk=self.note.pk).update(text='другой текст')
+        self.edit('третий текст')
+        revision = self.note.revisions.get(number=2)
+        self.assertTrue(revision.is_snapshot)
+        self.assertEqual(
+            revisions.reconstruct(self.note, 2), ('Заметка', 'третий текст')
+        )
+
+    def test_list_and_restore(self):
+        self.edit('новый текст', title='Новый заголовок')
+        response = self.client.get(
+            reverse('notes:revisions', args=(self.note.slug,))
+        )
+        self.assertEqual(
+            [revision.number for revision in response.context['revisions']],
+            [2, 1],
+        )
+        url = reverse('notes:revision', args=(self.note.slug, 1))
+        self.assertEqual(
+            self.client.get(url).context['text'], self.note.text
+        )
+        response = self.client.post(url)
+        self.assertRedirects(
+            response, reverse('notes:detail', args=(self.note.slug,))
+        )
+        note = Note.objects.get(pk=self.note.pk)
+        self.assertEqual((note.title, note.text),
+                         ('Заметка', self.note.text))
+        self.assertEqual(note.revisions.count(), 3)
+
+    def test_other_user_cannot_see_history(self):
+        self.client.force_login(self.reader)
+        for url in (
+            reverse('notes:revisions', args=(self.note.slug,)),
+            reverse('notes:revision', args=(self.note.slug, 1)),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(NoteRevision.objects.count(), 1)
@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory, RequestFactory, TestCase, override_settings
+)
+
+from notes import routers
+from notes.middleware import ReplicaRoutingMiddleware
+from notes.models import Note
+
+User = get_user_model()
+
+REPLICA = 'replica_1'
+
+
+def read_aliases():
+    return {
+        'note': router.db_for_read(Note),
+        'user': router.db_for_read(User),
+    }
+
+
+@override_settings(NOTES_DB_REPLICAS=[REPLICA])
+class ReplicaRouterTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+
+    def setUp(self):
+        cache.clear()
+
+    def request(self, method='get', user=None, view=read_aliases):
+        request = getattr(RequestFactory(), method)('/')
+        request.user = user or self.reader
+        result = []
+
+        def get_response(request):
+            result.append(view())
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(get_response)(request)
+        return result[0]
+
+    def test_reads_outside_request_use_primary(self):
+        self.assertEqual(router.db_for_read(Note), 'default')
+
+    def test_get_reads_notes_from_replica(self):
+        self.assertEqual(
+            self.request(), {'note': REPLICA, 'user': 'default'}
+        )
+        self.assertEqual(
+            self.request(user=AnonymousUser())['note'], REPLICA
+        )
+
+    def test_unsafe_methods_read_primary(self):
+        for method in ('post', 'put', 'patch', 'delete'):
+            with self.subTest(method=method):
+                self.assertEqual(self.request(method)['note'], 'default')
+
+    def test_write_in_request_switches_to_primary(self):
+        def view():
+            before = router.db_for_read(Note)
+            router.db_for_write(Note)
+            return [before, router.db_for_read(Note)]
+
+        self.assertEqual(self.request(view=view), [REPLICA, 'default'])
+
+    def test_note_change_pins_author_to_primary(self):
+        Note.objects.create(title='Заметка', text='Текст', author=self.author)
+        self.assertEqual(self.request(user=self.author)['note'], 'default')
+        self.assertEqual(self.request(user=self.reader)['note'], REPLICA)
+        cache.delete(routers.PIN_KEY.format(user_id=self.author.pk))
+        self.assertEqual(self.request(user=self.author)['note'], REPLICA)
+
+    def test_objects_from_replica_are_written_to_primary(self):
+        note = Note(title='Заметка', author=self.author)
+        note._state.db = REPLICA
+        self.assertEqual(router.db_for_write(Note, instance=note), 'default')
+
+    def test_no_migrations_on_replicas(self):
+        self.assertFalse(router.allow_migrate(REPLICA, 'notes'))
+        self.assertTrue(router.allow_migrate('default', 'notes'))
+
+    async def test_async_request(self):
+        result = []
+
+        async def get_response(request):
+            result.append(read_aliases())
+            return HttpResponse()
+
+        async def auser():
+            return self.reader
+
+        request = AsyncRequestFactory().get('/')
+        request.auser = auser
+        await ReplicaRoutingMiddleware(get_response)(request)
+        self.assertEqual(result[0]['note'], REPLICA)
+
+    def test_replicas_require_shared_cache(self):
+        self.assertEqual(
+            [error.id for error in routers.check_shared_cache()],
+            ['notes.E001'],
+        )
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/tmp/yanote-cache',
+        }}):
+            self.assertEqual(routers.check_shared_cache(), [])
+
+    @override_settings(NOTES_DB_REPLICAS=[])
+    def test_without_replicas_everything_reads_primary(self):
+        self.assertEqual(self.request()['note'], 'default')
@@ -2,10 +2,15 @@ from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
 from notes.models import Note
+from .common_test import (
+    ANONYMOUS_BUDGETS, AUTH_USER_BUDGETS, QueryBudgetMixin,
+    create_large_dataset,
+)
 
 User = get_user_model()
 
@@ -25,6 +30,9 @@ class TestRoutes(TestCase):
             slug="test-slug",
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_home_page(self):
         url = reverse('notes:home')
         response = self.client.get(url)
@@ -66,4 +74,44 @@ class TestRoutes(TestCase):
                 url = reverse(name, args=(self.note.slug,))
                 redirect_url = f'{login_url}?next={url}'
                 response = self.client.get(url)
-                self.assertRedirects(response, redirect_url) 
\ No newline at end of file
+                self.assertRedirects(response, redirect_url)
+
+    def test_search_page(self):
+        url = reverse('notes:search')
+        response = self.client.get(url)
+        self.assertRedirects(response, f'{reverse("users:login")}?next={url}')
+        self.client.force_login(self.reader)
+        response = self.client.get(url, {'q': 'текст'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class TestRouteBudgets(QueryBudgetMixin, TestCase):
+    """Бюджеты страниц на 10 000 заметок у 100 пользователей."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Лев Толстой')
+        create_large_dataset(cls.author)
+        cls.slug = Note.objects.filter(author=cls.author).first().slug
+
+    def setUp(self):
+        cache.clear()
+
+    def test_auth_user_budgets(self):
+        self.client.force_login(self.author)
+        for name, (queries, ms) in AUTH_USER_BUDGETS.items():
+            args = (self.slug,) if name in (
+                'notes:detail', 'notes:edit', 'notes:delete'
+            ) else None
+            with self.subTest(name=name):
+                with self.assertBudget(queries, ms):
+                    response = self.client.get(
+                        reverse(name, args=args), {'q': 'заметка'}
+                    )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_anonymous_budgets(self):
+        for name, (queries, ms) in ANONYMOUS_BUDGETS.items():
+            with self.subTest(name=name):
+                with self.assertBudget(queries, ms):
+                    response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, HTTPStatus.OK)
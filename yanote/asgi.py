@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+# Заметки и под ASGI обслуживают синхронные представления: асинхронные
+# (notes.async_views) на SQLite медленнее, см. benchmarks.asgi_wsgi.
+# Включить их: YANOTE_ASYNC_VIEWS=1 uvicorn yanote.asgi:application
 
 application = get_asgi_application()
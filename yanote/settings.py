@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -23,10 +24,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'notes.middleware.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'notes.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -55,10 +58,79 @@ WSGI_APPLICATION = 'yanote.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('YANOTE_DB_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Профиль SQLite для боевого сервера, включается YANOTE_DB_PROFILE=production.
+# WAL позволяет читать параллельно с записью, IMMEDIATE-транзакции берут
+# блокировку записи сразу и не падают с «database is locked» при попытке
+# повысить её посреди транзакции, а busy_timeout ждёт освобождения
+# блокировки вместо мгновенной ошибки.
+SQLITE_PRODUCTION_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    # В режиме WAL NORMAL не теряет целостность, только последние
+    # транзакции при отключении питания.
+    'PRAGMA synchronous = NORMAL',
+    # Отрицательное значение задаёт размер в КБ: 64 МБ на соединение.
+    'PRAGMA cache_size = -65536',
+    'PRAGMA mmap_size = 268435456',
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA temp_store = MEMORY',
+)
+
+if os.environ.get('YANOTE_DB_PROFILE') == 'production':
+    DATABASES['default'].update({
+        # Соединение живёт между запросами: PRAGMA и кэш страниц SQLite
+        # не приходится заводить заново на каждый запрос.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': '; '.join(SQLITE_PRODUCTION_PRAGMAS),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+
+# Реплики только для чтения: YANOTE_DB_REPLICAS — пути к копиям базы
+# через запятую, они становятся алиасами replica_1, replica_2, ... Локально
+# копии обновляет команда notes_sync_replicas. Чтение заметок идёт на
+# реплики, всё остальное — на default (см. notes.routers).
+NOTES_DB_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.environ.get('YANOTE_DB_REPLICAS', '').split(',')), 1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': path,
+        # Тестовая база для реплики не создаётся. Тесты запускаются без
+        # YANOTE_DB_REPLICAS, роутер проверяется в tests/test_routers.py.
+        'TEST': {'MIRROR': 'default'},
+    }
+    NOTES_DB_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['notes.routers.ReplicaRouter']
+# Сколько секунд после изменения заметок пользователя читать их с
+# основной базы; должно быть больше отставания реплик.
+NOTES_DB_PIN_SECONDS = 5
+
+
+# По умолчанию кэш живёт в памяти процесса. Чтобы несколько процессов
+# делили один кэш, укажите каталог в YANOTE_FILE_CACHE_DIR.
+if os.environ.get('YANOTE_FILE_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['YANOTE_FILE_CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -85,7 +157,55 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Сессия и пользователь читаются из кэша, а не из базы на каждый запрос.
+# Кэш по умолчанию у каждого процесса свой: при нескольких процессах
+# выход и смена пароля в одном из них доходят до остальных только по
+# истечении кэша, если не задан общий YANOTE_FILE_CACHE_DIR.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTHENTICATION_BACKENDS = [
+    'notes.auth.CachedModelBackend',
+    # Сессии, открытые до кэша пользователей, хранят путь ModelBackend:
+    # без него в списке их владельцы оказались бы разлогинены. Вход он
+    # не проверяет: CachedModelBackend отклоняет неверный пароль сам.
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
 
 NOTES_COUNT_ON_HOME_PAGE = 10
+
+NOTES_PER_PAGE = 20
+
+# Сколько последних заголовков держать в кэше транслитерации slug.
+NOTES_SLUG_CACHE_SIZE = 4096
+# Транслитерация через str.translate вместо pytils (результат тот же).
+NOTES_FAST_SLUGIFY = False
+
+# Кэш отрисованных страниц списка и заметки (см. notes.caching).
+NOTES_CACHE_ALIAS = 'default'
+NOTES_PAGE_CACHE_TIMEOUT = 60 * 60
+# Тексты от стольких байт хранятся сжатыми (см. notes.fields); None —
+# не сжимать новые тексты.
+NOTES_TEXT_COMPRESS_OVER = 8 * 1024
+# Сколько заметок принимает пакетный запрос API и отдаёт страница списка
+# API (см. notes.api).
+NOTES_API_BATCH_SIZE = 100
+# Админка: пачка массовых действий и предел, до которого считаются
+# заметки в списке (см. notes.admin).
+NOTES_ADMIN_BATCH_SIZE = 500
+NOTES_ADMIN_COUNT_LIMIT = 10_000
+# Полный снимок текста в истории заметки — раз в столько ревизий.
+NOTES_REVISION_SNAPSHOT_EVERY = 50
+# Через сколько дней purge_notes физически удаляет удалённые заметки.
+NOTES_PURGE_AFTER_DAYS = 30
+# Сколько секунд пользователь сессии живёт в кэше (см. notes.auth).
+NOTES_USER_CACHE_TIMEOUT = 5 * 60
+
+# Асинхронные представления заметок под ASGI; по умолчанию выключены,
+# включаются переменной окружения YANOTE_ASYNC_VIEWS=1 (см. yanote/asgi.py).
+NOTES_ASYNC_VIEWS = os.environ.get('YANOTE_ASYNC_VIEWS') == '1'
+
+# Метрики страниц (см. notes.metrics). Если задано число N, в лог пишутся
+# запросы, повторённые в одном ответе больше N раз (N+1).
+NOTES_METRICS_N_PLUS_ONE = None
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
@@ -7,7 +8,10 @@ from django.contrib.auth.views import LogoutView
 from notes import views
 
 urlpatterns = [
-    path('', include('notes.urls')),
+    path('', include(
+        'notes.async_urls' if settings.NOTES_ASYNC_VIEWS else 'notes.urls'
+    )),
+    path('api/notes/', include('notes.api_urls')),
     path('admin/', admin.site.urls),
 ]
 